@@ -1,55 +1,373 @@
+import argparse
+import hashlib
+import io
+import json
 import os
+import queue
 import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from PIL import Image
 import numpy as np
-import tensorflow as tf
+
+# prediction_cache.py sits next to this script (also when it's loaded from elsewhere)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from prediction_cache import PredictionCache, content_hash
+
+# TensorFlow is only imported when a model is actually needed: importing it
+# (and building MobileNetV2) costs seconds, and the .tflite model below doesn't
+# need it at all when the small tflite-runtime package is installed.
 
 # --- SETTINGS ---
 INPUT_FOLDER = "images_in"
 OUTPUT_FOLDER = "classified"
+BATCH_SIZE = 16     # images per model.predict() call
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+DECODE_WORKERS = 4          # threads decoding and resizing images
+PREFETCH_BATCHES = 2        # decoded batches waiting for the model (queue depth)
+TFLITE_MODEL = "mobilenet_v2.tflite"    # used instead of Keras when it exists
+CACHE_FILE = "predictions.sqlite3"      # classification results by image content
+TOP_K = 5                               # predictions kept per image
 
 # Create folders if not exist
 os.makedirs(INPUT_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
-# Load pre-trained MobileNetV2 model + labels
-model = tf.keras.applications.MobileNetV2(weights="imagenet")
-decode_predictions = tf.keras.applications.mobilenet_v2.decode_predictions
-preprocess_input = tf.keras.applications.mobilenet_v2.preprocess_input
+# --- Model (loaded on first use) ---
+_model = None
+_labels = None
+
+def labels_path(model_path):
+    return os.path.splitext(model_path)[0] + ".labels.json"
+
+def get_model():
+    """The classifier: the exported .tflite model if there is one, else Keras MobileNetV2."""
+    global _model
+    if _model is None:
+        if os.path.exists(TFLITE_MODEL):
+            _model = TFLiteModel(TFLITE_MODEL)
+        else:
+            import tensorflow as tf
+            _model = tf.keras.applications.MobileNetV2(weights="imagenet")
+    return _model
+
+def get_labels():
+    """ImageNet class names, in the model's output order."""
+    global _labels
+    if _labels is None:
+        if os.path.exists(TFLITE_MODEL):
+            with open(labels_path(TFLITE_MODEL), "r") as f:
+                _labels = json.load(f)
+        else:
+            _labels = keras_labels()
+    return _labels
+
+def keras_labels():
+    import tensorflow as tf
+    decode_predictions = tf.keras.applications.mobilenet_v2.decode_predictions
+    # One "prediction" per class picks out each class's name in order
+    return [decoded[0][1] for decoded in decode_predictions(np.eye(1000), top=1)]
+
+class TFLiteModel:
+    """A .tflite classifier with the same predict_on_batch() as a Keras model."""
+
+    def __init__(self, path):
+        try:
+            from tflite_runtime.interpreter import Interpreter   # pip install tflite-runtime
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=path, num_threads=os.cpu_count())
+        self._batch = None
+
+    def _resize(self, batch):
+        index = self.interpreter.get_input_details()[0]["index"]
+        self.interpreter.resize_tensor_input(index, [batch, 224, 224, 3])
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch = batch
+
+    def predict_on_batch(self, images):
+        if len(images) != self._batch:
+            self._resize(len(images))
+        x = np.asarray(images, dtype=np.float32)
+        scale, zero = self._input["quantization"]
+        if self._input["dtype"] != np.float32:      # quantized model with integer input
+            limits = np.iinfo(self._input["dtype"])
+            x = np.clip(np.round(x / scale + zero), limits.min, limits.max).astype(self._input["dtype"])
+        self.interpreter.set_tensor(self._input["index"], x)
+        self.interpreter.invoke()
+        out = self.interpreter.get_tensor(self._output["index"])
+        scale, zero = self._output["quantization"]
+        if self._output["dtype"] != np.float32:
+            out = (out.astype(np.float32) - zero) * scale
+        return out
+
+def export_tflite(path=TFLITE_MODEL, int8=False, sample_folder=INPUT_FOLDER, samples=100):
+    """Convert MobileNetV2 to a .tflite file (+ its labels) for fast CPU inference.
+
+    int8=True quantizes weights and activations to 8 bits (about 4x smaller
+    and faster on CPU); up to `samples` images from sample_folder are used to
+    calibrate the value ranges.
+    """
+    import tensorflow as tf
+    keras_model = tf.keras.applications.MobileNetV2(weights="imagenet")
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if int8:
+        def representative_images():
+            paths = [os.path.join(sample_folder, name) for name in sorted(os.listdir(sample_folder))
+                     if name.lower().endswith(IMAGE_EXTENSIONS)][:samples]
+            if not paths:
+                print("No sample images found, calibrating with random data")
+                for _ in range(samples):
+                    yield [np.random.uniform(-1, 1, (1, 224, 224, 3)).astype(np.float32)]
+            for image_path in paths:
+                yield [load_image(image_path)[np.newaxis]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_images
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    with open(labels_path(path), "w") as f:
+        json.dump(keras_labels(), f)
+    print(f"Saved {'int8 ' if int8 else ''}model to {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+# --- Classifying ---
+def load_image(image):
+    """Decode and resize one image (path or file object) -> 224x224x3 array for the model."""
+    img = Image.open(image).convert('RGB').resize((224, 224))
+    # MobileNetV2's preprocess_input: scale pixels to -1..1
+    return np.asarray(img, dtype=np.float32) / 127.5 - 1.0
+
+def predict_batch(images, top=TOP_K):
+    """Top predictions [(label, score), ...] for each preprocessed image, with one predict call."""
+    predictions = np.asarray(get_model().predict_on_batch(np.stack(images)))
+    labels = get_labels()
+    best = np.argsort(-predictions, axis=1)[:, :top]
+    return [[(labels[i], float(row[i])) for i in order] for row, order in zip(predictions, best)]
+
+def classify_batch(images):
+    """Top label for each preprocessed image array, with one predict call."""
+    return [predictions[0][0] for predictions in predict_batch(images, top=1)]
 
 def classify_image(image_path):
     """Return top label prediction for a given image."""
     try:
-        img = Image.open(image_path).convert('RGB').resize((224, 224))
-        img_array = np.array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array = preprocess_input(img_array)
-
-        predictions = model.predict(img_array)
-        decoded = decode_predictions(predictions, top=1)[0][0]
-        label = decoded[1]  # e.g., 'golden_retriever'
-        return label
+        return classify_batch([load_image(image_path)])[0]
     except Exception as e:
         print(f"Error processing {image_path}: {e}")
         return "unknown"
 
-def organize_images():
+def model_identity():
+    """Names the model in cache keys, without loading it."""
+    if os.path.exists(TFLITE_MODEL):
+        digest = hashlib.blake2b(digest_size=8)
+        with open(TFLITE_MODEL, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return f"tflite-{digest.hexdigest()}"
+    return "keras-mobilenet_v2-imagenet"
+
+def move_image(file_path, label):
+    filename = os.path.basename(file_path)
+    label_folder = os.path.join(OUTPUT_FOLDER, label)
+    os.makedirs(label_folder, exist_ok=True)
+
+    new_name = f"{label}_{filename}"
+    new_path = os.path.join(label_folder, new_name)
+    shutil.move(file_path, new_path)
+    print(f"Moved {filename} → {new_path}")
+
+class PipelineStats:
+    """Where the time went: busy and waiting time of each stage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.images = 0
+        self.batches = 0
+        self.decode_seconds = 0.0       # summed over decode threads
+        self.decoders_waiting = 0.0     # batches ready, queue full: model is the bottleneck
+        self.inference_seconds = 0.0
+        self.model_waiting = 0.0        # queue empty: decoding is the bottleneck
+
+    def add_decode(self, seconds):
+        with self._lock:    # called from every decode thread
+            self.decode_seconds += seconds
+
+    def report(self):
+        print(f"{self.images} images in {self.batches} batches")
+        print(f"  decode:    {self.decode_seconds:.2f}s busy (all threads), "
+              f"{self.decoders_waiting:.2f}s waiting for the model")
+        print(f"  inference: {self.inference_seconds:.2f}s busy, "
+              f"{self.model_waiting:.2f}s waiting for images")
+
+class _Entry:
+    """One image on its way through the pipeline."""
+
+    def __init__(self, path):
+        self.path = path
+        self.digest = None          # content hash of the file
+        self.data = None            # file bytes, dropped once decoded
+        self.image = None           # preprocessed array, if inference is needed
+        self.predictions = None     # [(label, score), ...] from the cache or the model
+
+def _read(entry):
+    """Read the file once: its bytes are hashed for the cache and decoded from memory."""
+    try:
+        with open(entry.path, "rb") as f:
+            entry.data = f.read()
+        entry.digest = content_hash(entry.data)
+    except OSError as e:
+        print(f"Error processing {entry.path}: {e}")
+
+def _decode(entry, stats):
+    start = time.perf_counter()
+    try:
+        entry.image = load_image(io.BytesIO(entry.data))
+    except Exception as e:
+        print(f"Error processing {entry.path}: {e}")
+    finally:
+        entry.data = None
+        stats.add_decode(time.perf_counter() - start)
+
+def _put(ready, item, stop):
+    """Queue item for the model; gives up if the consumer has stopped."""
+    while not stop.is_set():
+        try:
+            ready.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+def _decode_batches(paths, batch_size, workers, ready, stop, stats, cache):
+    """Producer thread: read, look up and decode batches in the pool, queue them for the model."""
+    try:
+        with ThreadPoolExecutor(workers) as pool:
+            paths = iter(paths)
+            while not stop.is_set():
+                entries = [_Entry(path) for path in islice(paths, batch_size)]
+                if not entries:
+                    break
+                list(pool.map(_read, entries))
+                if cache is not None:
+                    # Cache hits skip decoding and inference completely
+                    found = cache.get_many([e.digest for e in entries if e.digest])
+                    for entry in entries:
+                        if entry.digest in found:
+                            entry.predictions, entry.data = found[entry.digest], None
+                list(pool.map(lambda e: _decode(e, stats), [e for e in entries if e.data is not None]))
+                start = time.perf_counter()
+                _put(ready, entries, stop)
+                stats.decoders_waiting += time.perf_counter() - start
+        _put(ready, None, stop)
+    except BaseException as e:
+        _put(ready, e, stop)
+
+def classify_paths(paths, batch_size=BATCH_SIZE, workers=DECODE_WORKERS,
+                   prefetch=PREFETCH_BATCHES, stats=None, cache=None):
+    """Yield (path, label) for every path, running the model on whole batches.
+
+    A single image per predict() call leaves most of the CPU idle, so images
+    are collected into batches of batch_size (the last one may be smaller).
+    While the model works on one batch, a pool of `workers` threads decodes
+    and resizes the next ones; at most `prefetch` decoded batches wait in the
+    queue, which bounds memory. Images that can't be read are labelled
+    "unknown" without stopping the batch; if the model fails on a batch, its
+    images aren't yielded at all, so callers leave them where they are.
+
+    The model and labels are loaded before anything is read: if that fails
+    (no weights, no .labels.json, no TensorFlow), the error is raised here
+    instead of every image coming out as "unknown".
+
+    With a PredictionCache, images whose bytes were classified before (by the
+    same model) are neither decoded nor run through the model.
+    """
+    stats = stats if stats is not None else PipelineStats()
+    get_model()
+    get_labels()
+    ready = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+    producer = threading.Thread(target=_decode_batches, daemon=True,
+                                args=(paths, batch_size, workers, ready, stop, stats, cache))
+    producer.start()
+    try:
+        while True:
+            start = time.perf_counter()
+            entries = ready.get()
+            stats.model_waiting += time.perf_counter() - start
+            if entries is None:
+                break
+            if isinstance(entries, BaseException):
+                raise entries
+            to_run = [e for e in entries if e.predictions is None and e.image is not None]
+            failed = set()
+            if to_run:
+                start = time.perf_counter()
+                try:
+                    for entry, predictions in zip(to_run, predict_batch([e.image for e in to_run])):
+                        entry.predictions = predictions
+                    if cache is not None:
+                        cache.put_many([(e.digest, e.predictions) for e in to_run])
+                except Exception as e:
+                    print(f"Error classifying batch, leaving {len(to_run)} image(s) in place: {e}")
+                    failed = {id(entry) for entry in to_run if entry.predictions is None}
+                stats.inference_seconds += time.perf_counter() - start
+            stats.images += len(entries)
+            stats.batches += 1
+            for entry in entries:
+                if id(entry) not in failed:
+                    yield entry.path, entry.predictions[0][0] if entry.predictions else "unknown"
+    finally:
+        stop.set()      # the caller may stop early; let the producer finish
+
+def organize_images(batch_size=BATCH_SIZE, workers=DECODE_WORKERS, prefetch=PREFETCH_BATCHES,
+                    use_cache=True):
     """Classify and move images."""
-    for filename in os.listdir(INPUT_FOLDER):
-        if not filename.lower().endswith((".jpg", ".jpeg", ".png")):
-            continue
-        
-        file_path = os.path.join(INPUT_FOLDER, filename)
-        label = classify_image(file_path)
-        label_folder = os.path.join(OUTPUT_FOLDER, label)
-        os.makedirs(label_folder, exist_ok=True)
-
-        new_name = f"{label}_{filename}"
-        new_path = os.path.join(label_folder, new_name)
-        shutil.move(file_path, new_path)
-        print(f"Moved {filename} → {new_path}")
+    paths = [os.path.join(INPUT_FOLDER, filename) for filename in os.listdir(INPUT_FOLDER)
+             if filename.lower().endswith(IMAGE_EXTENSIONS)]
+    stats = PipelineStats()
+    cache = PredictionCache(CACHE_FILE, model_identity()) if use_cache else None
+    try:
+        # Moves happen once a whole batch is classified
+        for path, label in classify_paths(paths, batch_size, workers, prefetch, stats, cache):
+            move_image(path, label)
+    finally:
+        stats.report()
+        if cache is not None:
+            cache.report()
+            cache.close()
 
 if __name__ == "__main__":
-    print("🔍 Classifying images in folder:", INPUT_FOLDER)
-    organize_images()
-    print("✅ Classification complete!")
+    parser = argparse.ArgumentParser(description="Classify images and sort them into folders")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=DECODE_WORKERS, help="decode threads")
+    parser.add_argument("--prefetch", type=int, default=PREFETCH_BATCHES,
+                        help="decoded batches allowed to wait for the model")
+    parser.add_argument("--model", metavar="PATH",
+                        help=f".tflite model to use when it exists (default {TFLITE_MODEL})")
+    parser.add_argument("--export-tflite", metavar="PATH", nargs="?", const="",
+                        help="export the model to a .tflite file (default: the --model path) "
+                             "and exit; classify with it later via --model PATH")
+    parser.add_argument("--int8", action="store_true", help="quantize the exported model to int8")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"classify every image again, ignoring {CACHE_FILE}")
+    args = parser.parse_args()
+
+    # get_model(), get_labels() and model_identity() all read TFLITE_MODEL
+    if args.model:
+        if args.export_tflite is None and not os.path.exists(args.model):
+            parser.error(f"model {args.model} not found (create it with --export-tflite {args.model})")
+        TFLITE_MODEL = args.model
+
+    if args.export_tflite is not None:
+        export_tflite(args.export_tflite or TFLITE_MODEL, args.int8)
+    else:
+        print("🔍 Classifying images in folder:", INPUT_FOLDER)
+        organize_images(args.batch_size, args.workers, args.prefetch, not args.no_cache)
+        print("✅ Classification complete!")
@@ -1,15 +1,138 @@
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+import importlib.util
+import os
+import queue
+import threading
 import time
 
+# --- Load ICOS-1.py (its name isn't a valid module name, so no plain import) ---
+_spec = importlib.util.spec_from_file_location(
+    "icos", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ICOS-1.py"))
+icos = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(icos)
+
+# --- SETTINGS ---
+INPUT_FOLDER = icos.INPUT_FOLDER
+SETTLE_SECONDS = 1.0    # a file must be quiet (no events, same size) this long
+POLL_SECONDS = 0.5      # how often pending files are checked
+BATCH_WAIT = 2.0        # max seconds the worker waits to fill a batch
+MAX_READY = 256         # stable files waiting for the classifier (bounds memory)
+
+# Instead of re-scanning and re-classifying the whole folder on every event:
+#  1. events only record the path and when it last changed (a burst of events
+#     for one file collapses into one entry)
+#  2. a settle thread hands a file on once it had no events for SETTLE_SECONDS
+#     and its size stopped changing, so half-copied files aren't read
+#  3. one worker classifies the ready files in batches (model and cache stay
+#     loaded); the ready queue is bounded, so a long copy can't pile up memory
+
 class Watcher(FileSystemEventHandler):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}       # path -> (time of last event, last size seen)
+        self.folder = os.path.abspath(INPUT_FOLDER)
+
+    def add(self, path):
+        """Note a new or changed file; it is handed on once it has settled."""
+        # Files moved out to the output folders also raise events: ignore them
+        if (path.lower().endswith(icos.IMAGE_EXTENSIONS)
+                and os.path.dirname(os.path.abspath(path)) == self.folder):
+            with self.lock:
+                self.pending[path] = (time.monotonic(), None)
+
     def on_created(self, event):
-        if event.src_path.lower().endswith((".jpg", ".jpeg", ".png")):
-            print(f"\new image detected: {event.src_path}")
-            organize_images()
+        if not event.is_directory:
+            self.add(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.add(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.add(event.dest_path)    # e.g. "photo.jpg.part" renamed to "photo.jpg"
+
+    def settle(self, ready, stop):
+        """Settle thread: move quiet, fully written files to the ready queue."""
+        while not stop.is_set():
+            now = time.monotonic()
+            with self.lock:
+                candidates = [(path, changed, size) for path, (changed, size) in self.pending.items()
+                              if now - changed >= SETTLE_SECONDS]
+            for path, changed, last_size in candidates:
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    with self.lock:
+                        self.pending.pop(path, None)     # deleted or moved away
+                    continue
+                with self.lock:
+                    if self.pending.get(path, (None,))[0] != changed:
+                        continue                         # new events meanwhile
+                    if size != last_size:
+                        # First look, or still growing: check again after another quiet period
+                        self.pending[path] = (now, size)
+                        continue
+                    del self.pending[path]
+                print(f"\nNew image ready: {path}")
+                while not stop.is_set():
+                    try:
+                        ready.put(path, timeout=POLL_SECONDS)   # blocks while the worker is behind
+                        break
+                    except queue.Full:
+                        pass
+            stop.wait(POLL_SECONDS)
+
+def classify_worker(ready, stop):
+    """Worker thread: classify ready files in batches of icos.BATCH_SIZE and move them."""
+    cache = icos.PredictionCache(icos.CACHE_FILE, icos.model_identity())
+    try:
+        while not stop.is_set():
+            try:
+                batch = [ready.get(timeout=POLL_SECONDS)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + BATCH_WAIT
+            while len(batch) < icos.BATCH_SIZE:
+                try:
+                    batch.append(ready.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            batch = [path for path in dict.fromkeys(batch) if os.path.exists(path)]
+            # A bad batch or a file that vanished must not stop the worker:
+            # nothing would drain the ready queue after that
+            try:
+                for path, label in icos.classify_paths(batch, cache=cache):
+                    try:
+                        icos.move_image(path, label)
+                    except OSError as e:
+                        print(f"Error moving {path}: {e}")
+            except Exception as e:
+                print(f"Error classifying batch: {e}")
+    finally:
+        cache.report()
+        cache.close()
 
 if __name__ == "__main__":
+    # Load the model up front: if that fails (no weights, no labels file), stop
+    # here instead of failing every batch while files keep coming in
+    icos.get_model()
+    icos.get_labels()
+
     event_handler = Watcher()
+    ready = queue.Queue(maxsize=MAX_READY)
+    stop = threading.Event()
+
+    # Images already in the folder are picked up too
+    for name in os.listdir(INPUT_FOLDER):
+        event_handler.add(os.path.join(INPUT_FOLDER, name))
+
+    threads = [threading.Thread(target=event_handler.settle, args=(ready, stop)),
+               threading.Thread(target=classify_worker, args=(ready, stop))]
+    for thread in threads:
+        thread.start()
+
     observer = Observer()
     observer.schedule(event_handler, INPUT_FOLDER, recursive=False)
     observer.start()
@@ -19,4 +142,7 @@ if __name__ == "__main__":
             time.sleep(1)
     except KeyboardInterrupt:
         observer.stop()
+        stop.set()
     observer.join()
+    for thread in threads:
+        thread.join()
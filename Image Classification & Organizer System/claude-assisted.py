@@ -5,19 +5,87 @@ Automatically classifies, renames, and organizes images into folders
 
 import os
 import shutil
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
 from pathlib import Path
 from datetime import datetime
 from PIL import Image
 import hashlib
 
+# perceptual_hash.py sits next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from perceptual_hash import HASHES, THRESHOLD, near_duplicate_clusters
+
+# Duplicate detection
+PARTIAL_BYTES = 64 * 1024   # bytes hashed from each end of a file in the quick tier
+HASH_WORKERS = 8            # files hashed at once (I/O bound, so more than the CPU count)
+
 class ImageClassifier:
-    def __init__(self, source_folder, output_folder="organized_images"):
+    def __init__(self, source_folder, output_folder="organized_images",
+                 recursive=False, include=None, exclude=None):
         self.source_folder = Path(source_folder)
         self.output_folder = Path(output_folder)
         self.supported_formats = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tiff'}
         
+        # Scanning: subfolders too? include/exclude are glob patterns matched
+        # against a file's name or its path relative to source_folder
+        # (e.g. "IMG_*", "raw/*"); excluded folders aren't entered at all
+        self.recursive = recursive
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        
         # Create output folder if it doesn't exist
         self.output_folder.mkdir(exist_ok=True)
+    
+    def _matches(self, patterns, name, relative):
+        return any(fnmatch(name, p) or fnmatch(relative, p) for p in patterns)
+    
+    def iter_images(self):
+        """Yield (path, stat) for every supported image, as the folders are read
+        
+        One os.scandir pass per folder instead of a glob per extension: files
+        are handed out while the listing is still going, extensions match in
+        any case, and the stat result comes along so callers don't stat again.
+        """
+        # The output folder may sit inside the source folder: never re-ingest it
+        try:
+            skip = self.output_folder.resolve()
+        except OSError:
+            skip = None
+        
+        folders = [(self.source_folder, "")]
+        while folders:
+            folder, prefix = folders.pop()
+            subfolders = []
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        relative = prefix + entry.name
+                        if self._matches(self.exclude, entry.name, relative):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.recursive:
+                                    subfolders.append(entry)
+                                continue
+                            if (not entry.is_file()
+                                    or os.path.splitext(entry.name)[1].lower() not in self.supported_formats):
+                                continue
+                            if self.include and not self._matches(self.include, entry.name, relative):
+                                continue
+                            yield Path(entry.path), entry.stat()
+                        except OSError as e:
+                            print(f"Error processing {entry.path}: {e}")
+            except OSError as e:
+                print(f"Error reading folder {folder}: {e}")
+                continue
+            # Depth first, in listing order
+            for entry in reversed(subfolders):
+                if Path(entry.path).resolve() != skip:
+                    folders.append((Path(entry.path), prefix + entry.name + "/"))
         
     def classify_by_content(self, img_path):
         """Classify image based on basic properties"""
@@ -44,19 +112,19 @@ class ImageClassifier:
             print(f"Error classifying {img_path}: {e}")
             return "uncategorized"
     
-    def classify_by_date(self, img_path):
+    def classify_by_date(self, img_path, stat=None):
         """Classify by creation/modification date"""
         try:
-            timestamp = os.path.getmtime(img_path)
+            timestamp = stat.st_mtime if stat else os.path.getmtime(img_path)
             date = datetime.fromtimestamp(timestamp)
             return date.strftime("%Y-%m")
         except:
             return "unknown_date"
     
-    def classify_by_size(self, img_path):
+    def classify_by_size(self, img_path, stat=None):
         """Classify by file size"""
         try:
-            size_mb = os.path.getsize(img_path) / (1024 * 1024)
+            size_mb = (stat.st_size if stat else os.path.getsize(img_path)) / (1024 * 1024)
             if size_mb < 0.5:
                 return "small"
             elif size_mb < 2:
@@ -87,31 +155,19 @@ class ImageClassifier:
         print(f"Starting image organization from: {self.source_folder}")
         print(f"Output directory: {self.output_folder}\n")
         
-        # Find all images
-        image_files = []
-        for ext in self.supported_formats:
-            image_files.extend(self.source_folder.glob(f"*{ext}"))
-            image_files.extend(self.source_folder.glob(f"*{ext.upper()}"))
-        
-        if not image_files:
-            print("No images found in the source folder!")
-            return
-        
-        print(f"Found {len(image_files)} images\n")
-        
-        # Process each image
+        # Process each image as the scan finds it
         processed = 0
         skipped = 0
         
-        for idx, img_path in enumerate(image_files, 1):
+        for idx, (img_path, stat) in enumerate(self.iter_images(), 1):
             try:
                 # Classify image
                 if classification_method == "content":
                     category = self.classify_by_content(img_path)
                 elif classification_method == "date":
-                    category = self.classify_by_date(img_path)
+                    category = self.classify_by_date(img_path, stat)
                 elif classification_method == "size":
-                    category = self.classify_by_size(img_path)
+                    category = self.classify_by_size(img_path, stat)
                 else:
                     category = "general"
                 
@@ -135,6 +191,10 @@ class ImageClassifier:
                 print(f"✗ Error processing {img_path.name}: {e}\n")
                 skipped += 1
         
+        if processed + skipped == 0:
+            print("No images found in the source folder!")
+            return
+        
         # Summary
         print("=" * 60)
         print(f"Organization complete!")
@@ -143,30 +203,81 @@ class ImageClassifier:
         print(f"Output location: {self.output_folder.absolute()}")
         print("=" * 60)
     
+    def _partial_hash(self, img_path):
+        """Hash of the first and last PARTIAL_BYTES of a file"""
+        hasher = hashlib.blake2b()
+        with open(img_path, "rb") as f:
+            hasher.update(f.read(PARTIAL_BYTES))
+            size = os.fstat(f.fileno()).st_size
+            if size > PARTIAL_BYTES:
+                f.seek(max(PARTIAL_BYTES, size - PARTIAL_BYTES))
+                hasher.update(f.read(PARTIAL_BYTES))
+        return hasher.hexdigest()
+    
+    def _full_hash(self, img_path):
+        """BLAKE2b of the whole file"""
+        hasher = hashlib.blake2b()
+        with open(img_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    
+    def _split_groups(self, groups, hash_function, pool):
+        """Split each group of same-so-far files by hash_function (run in the pool)"""
+        paths = [path for group in groups for path in group]
+        
+        def safe_hash(path):
+            try:
+                return hash_function(path)
+            except OSError as e:
+                print(f"Error processing {path}: {e}")
+                return None
+        
+        by_hash = defaultdict(list)
+        # Files from different groups never compare equal: key on (group, hash)
+        group_of = {path: number for number, group in enumerate(groups) for path in group}
+        for path, file_hash in zip(paths, pool.map(safe_hash, paths)):
+            if file_hash is not None:
+                by_hash[group_of[path], file_hash].append(path)
+        return [group for group in by_hash.values() if len(group) > 1]
+    
     def find_duplicates(self):
-        """Find duplicate images based on hash"""
+        """Find duplicate images based on content
+        
+        Hashing every file in full is slow on big libraries, so candidates are
+        narrowed down in tiers, each only looking inside the groups left by the
+        one before:
+          1. file size (free, from stat)
+          2. hash of the first and last 64 KB
+          3. full BLAKE2b hash (skipped for files the partial hash already covered)
+        Hashing runs in a thread pool so the disks, not the CPU, set the pace.
+        """
         print("Scanning for duplicate images...\n")
         
-        image_files = []
-        for ext in self.supported_formats:
-            image_files.extend(self.source_folder.glob(f"*{ext}"))
-            image_files.extend(self.source_folder.glob(f"*{ext.upper()}"))
+        # Tier 1: same size (from the scan's stat, no extra calls)
+        by_size = defaultdict(list)
+        sizes = {}
+        for img_path, stat in self.iter_images():
+            sizes[img_path] = stat.st_size
+            by_size[stat.st_size].append(img_path)
+        groups = [group for group in by_size.values() if len(group) > 1]
         
-        hash_dict = {}
-        duplicates = []
+        with ThreadPoolExecutor(HASH_WORKERS) as pool:
+            # Tier 2: same start and end
+            groups = self._split_groups(groups, self._partial_hash, pool)
+            # Tier 3: same content (small files were already hashed completely)
+            small = [g for g in groups if sizes[g[0]] <= 2 * PARTIAL_BYTES]
+            large = [g for g in groups if sizes[g[0]] > 2 * PARTIAL_BYTES]
+            groups = small + self._split_groups(large, self._full_hash, pool)
         
-        for img_path in image_files:
-            try:
-                img_hash = self.generate_hash(img_path)
-                if img_hash in hash_dict:
-                    duplicates.append((hash_dict[img_hash], img_path))
-                    print(f"Duplicate found:")
-                    print(f"  Original: {hash_dict[img_hash].name}")
-                    print(f"  Duplicate: {img_path.name}\n")
-                else:
-                    hash_dict[img_hash] = img_path
-            except Exception as e:
-                print(f"Error processing {img_path}: {e}")
+        duplicates = []
+        for group in groups:
+            original, *copies = sorted(group)
+            for img_path in copies:
+                duplicates.append((original, img_path))
+                print(f"Duplicate found:")
+                print(f"  Original: {original.name}")
+                print(f"  Duplicate: {img_path.name}\n")
         
         if duplicates:
             print(f"Found {len(duplicates)} duplicate(s)")
@@ -174,6 +285,45 @@ class ImageClassifier:
             print("No duplicates found!")
         
         return duplicates
+    
+    def find_similar(self, method="phash", threshold=THRESHOLD):
+        """Find near-duplicate images (resized, re-encoded or lightly edited copies)
+        
+        Each image gets a perceptual hash ("dhash" or "phash", see
+        perceptual_hash.py); images whose hashes differ in at most threshold
+        bits are grouped. Returns a list of clusters (lists of paths).
+        """
+        print(f"Scanning for similar images ({method}, threshold {threshold})...\n")
+        hash_function = HASHES[method]
+        
+        def safe_hash(img_path):
+            try:
+                return hash_function(img_path)
+            except Exception as e:
+                print(f"Error processing {img_path}: {e}")
+                return None
+        
+        # Decoding and resizing release the GIL, so threads help here too;
+        # hashing starts while the scan is still going
+        with ThreadPoolExecutor(HASH_WORKERS) as pool:
+            futures = [(img_path, pool.submit(safe_hash, img_path)) for img_path, _ in self.iter_images()]
+            hashed = [(img_path, future.result()) for img_path, future in futures
+                      if future.result() is not None]
+        
+        clusters = [sorted(cluster) for cluster in near_duplicate_clusters(hashed, threshold)]
+        clusters.sort()
+        for cluster in clusters:
+            print(f"Similar images:")
+            for img_path in cluster:
+                print(f"  {img_path.name}")
+            print()
+        
+        if clusters:
+            print(f"Found {len(clusters)} group(s) of similar images")
+        else:
+            print("No similar images found!")
+        
+        return clusters
 
 
 # Example usage
@@ -183,6 +333,8 @@ if __name__ == "__main__":
     OUTPUT = "organized_images"  # Output folder
     
     # Create classifier instance
+    # (recursive=True also scans subfolders; include/exclude take patterns
+    # such as ["*.jpg"] or ["thumbnails/*"])
     classifier = ImageClassifier(SOURCE, OUTPUT)
     
     # Choose classification method: "content", "date", or "size"
@@ -200,3 +352,7 @@ if __name__ == "__main__":
     # Optional: Find duplicates
     print("\n" + "=" * 60)
     classifier.find_duplicates()
+    
+    # Optional: Find resized / re-encoded copies
+    print("\n" + "=" * 60)
+    classifier.find_similar()
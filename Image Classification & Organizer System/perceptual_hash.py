@@ -0,0 +1,160 @@
+"""
+Perceptual hashes and a Hamming-distance index for finding near-duplicate images.
+
+A byte hash only matches identical files, but a resized, re-encoded or
+slightly edited copy of a photo has different bytes. Perceptual hashes are
+64-bit fingerprints of a small grayscale version of the picture, so copies
+like that get hashes that differ in only a few bits:
+
+  dhash: is each pixel brighter than its right neighbour? (9x8 image)
+  phash: is each low-frequency DCT coefficient above the median? (32x32 image)
+
+Both are computed with NumPy on the downscaled image. Comparing every pair
+of hashes is O(n^2); HammingIndex looks up only the hashes that share a
+nearly equal block of bits, so clustering a library is about one cheap
+lookup per image.
+"""
+
+from collections import defaultdict
+from itertools import combinations
+
+from PIL import Image
+import numpy as np
+
+# --- Settings ---
+HASH_SIZE = 8           # hashes are HASH_SIZE x HASH_SIZE = 64 bits
+PHASH_SCALE = 4         # phash takes the DCT of a (HASH_SIZE * PHASH_SCALE)^2 image
+THRESHOLD = 10          # hashes differing in <= this many bits are near duplicates
+BLOCKS = 4              # HammingIndex blocks (16 bits each for 64-bit hashes)
+
+
+def _gray(img_path, width, height):
+    """Image as a height x width float array of grayscale values."""
+    with Image.open(img_path) as img:
+        # JPEGs can be decoded at 1/2 .. 1/8 scale directly, much faster than full size
+        img.draft("L", (width * 4, height * 4))
+        small = img.convert("L").resize((width, height), Image.BILINEAR)
+        return np.asarray(small, dtype=np.float32)
+
+
+def _bits_to_int(bits):
+    """Boolean array -> int, first element is the highest bit."""
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def dhash(img_path, size=HASH_SIZE):
+    """Difference hash: horizontal brightness gradients of a (size+1) x size image."""
+    pixels = _gray(img_path, size + 1, size)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+_dct_matrices = {}
+
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II matrix: D @ x is the DCT of vector x."""
+    if n not in _dct_matrices:
+        k = np.arange(n)[:, None]
+        i = np.arange(n)[None, :]
+        matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+        matrix[0] /= np.sqrt(2)
+        _dct_matrices[n] = matrix.astype(np.float32)
+    return _dct_matrices[n]
+
+
+def phash(img_path, size=HASH_SIZE, scale=PHASH_SCALE):
+    """DCT hash: low frequencies of a (size*scale)^2 image compared with their median."""
+    n = size * scale
+    dct = _dct_matrix(n)
+    coefficients = (dct @ _gray(img_path, n, n) @ dct.T)[:size, :size]
+    # The DC term (overall brightness) would skew the median
+    median = np.median(coefficients.ravel()[1:])
+    return _bits_to_int(coefficients > median)
+
+
+HASHES = {"dhash": dhash, "phash": phash}
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class HammingIndex:
+    """Hashes -> items, searchable by Hamming distance.
+
+        index = HammingIndex(max_distance=10)
+        index.add(h, path)
+        index.search(h)   # [(path, distance), ...]
+
+    The 64 bits are cut into BLOCKS blocks. Two hashes within max_distance
+    bits differ in at most max_distance // BLOCKS bits in at least one block
+    (pigeonhole), so a search only looks in the buckets of each block's
+    value with up to that many bits flipped, instead of at every hash.
+    """
+
+    def __init__(self, max_distance=THRESHOLD, bits=HASH_SIZE * HASH_SIZE, blocks=BLOCKS):
+        self.max_distance = max_distance
+        radius = max_distance // blocks
+        # (shift, mask, masks of up to radius bits to flip) of each block;
+        # sizes differ by at most one bit
+        self._blocks = []
+        start = 0
+        for number in range(blocks):
+            width = bits // blocks + (1 if number < bits % blocks else 0)
+            flips = [sum(1 << bit for bit in flipped)
+                     for r in range(radius + 1) for flipped in combinations(range(width), r)]
+            self._blocks.append((start, (1 << width) - 1, flips))
+            start += width
+        self._tables = [defaultdict(list) for _ in self._blocks]
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, hash_value, item):
+        for (shift, mask, _), table in zip(self._blocks, self._tables):
+            table[hash_value >> shift & mask].append((hash_value, item))
+        self._size += 1
+
+    def search(self, hash_value):
+        """[(item, distance)] of every hash within max_distance, closest first."""
+        found = {}
+        max_distance = self.max_distance
+        for (shift, mask, flips), table in zip(self._blocks, self._tables):
+            key = hash_value >> shift & mask
+            get = table.get
+            for flip in flips:
+                for other, item in get(key ^ flip, ()):
+                    distance = (hash_value ^ other).bit_count()
+                    if distance <= max_distance:
+                        found[id(item), other] = (item, distance)
+        return sorted(found.values(), key=lambda pair: pair[1])
+
+
+def near_duplicate_clusters(hashed, threshold=THRESHOLD):
+    """Group (item, hash) pairs into clusters of near duplicates.
+
+    Items are linked when their hashes are within threshold bits; linked
+    items end up in one cluster (so a cluster can chain A~B~C even if A and C
+    are further apart). Returns the clusters with more than one item.
+    """
+    parent = {}
+
+    def root(item):
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    index = HammingIndex(threshold)
+    for item, hash_value in hashed:
+        parent[item] = item
+        # Searching before adding finds each close pair once
+        for other, _ in index.search(hash_value):
+            parent[root(other)] = root(item)
+        index.add(hash_value, item)
+
+    clusters = {}
+    for item in parent:
+        clusters.setdefault(root(item), []).append(item)
+    return [cluster for cluster in clusters.values() if len(cluster) > 1]
@@ -0,0 +1,105 @@
+"""
+Persistent cache of classification results, keyed by image content.
+
+Re-ingested or copied images used to go through decode and inference again
+even when their bytes were identical. Results are stored under
+
+    <BLAKE2b of the file bytes>:<model identity>
+
+so a copy under any name is a hit, and switching models (Keras vs. an
+exported .tflite, int8 or not) never serves another model's predictions. The
+top-k (label, score) pairs are kept in one SQLite file; once it holds more
+than max_entries results, the least recently used ones are dropped.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# --- Settings ---
+CACHE_FILE = "predictions.sqlite3"
+MAX_ENTRIES = 200_000
+
+
+def content_hash(data):
+    """Hex digest identifying an image by its bytes."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+class PredictionCache:
+    """content hash + model identity -> [(label, score), ...] top-k predictions."""
+
+    def __init__(self, path=CACHE_FILE, model_id="", max_entries=MAX_ENTRIES):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Looked up by the decode thread, filled in by the inference thread
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS predictions (
+                                key TEXT PRIMARY KEY,
+                                predictions TEXT NOT NULL,
+                                used_at REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS predictions_used ON predictions (used_at)")
+        self._db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _key(self, digest):
+        return f"{digest}:{self.model_id}"
+
+    def get_many(self, digests):
+        """{digest: predictions} for the digests that are cached; counts hits/misses."""
+        keys = {self._key(d): d for d in digests}
+        found = {}
+        if not keys:
+            return found
+        with self._lock:
+            for key, predictions in self._db.execute(
+                    f"SELECT key, predictions FROM predictions WHERE key IN "
+                    f"({','.join('?' * len(keys))})", list(keys)):
+                found[keys[key]] = [tuple(p) for p in json.loads(predictions)]
+            if found:
+                now = time.time()
+                self._db.executemany("UPDATE predictions SET used_at = ? WHERE key = ?",
+                                     [(now, self._key(d)) for d in found])
+                self._db.commit()
+            self.hits += len(found)
+            self.misses += len(set(digests)) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Store (digest, predictions) pairs."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO predictions VALUES (?, ?, ?)",
+                                 [(self._key(d), json.dumps(p), now) for d, p in items])
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries beyond max_entries."""
+        count = self._db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute("DELETE FROM predictions WHERE key IN (SELECT key FROM predictions "
+                             "ORDER BY used_at LIMIT ?)", (count - self.max_entries,))
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        print(f"  cache:     {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)")
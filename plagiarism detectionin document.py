@@ -1,27 +1,45 @@
-# Importing SequenceMatcher from the difflib module
-# SequenceMatcher helps compare two sequences (strings, lists, etc.)
-# and gives a similarity ratio between 0 and 1.
-from difflib import SequenceMatcher
+# Document plagiarism check using the winnowing fingerprint engine
+# (plagiarismDetectors/winnowing.py).
+# SequenceMatcher got really slow on long essays (50-200 KB) and its
+# "autojunk" heuristic skewed the results, so we fingerprint instead:
+# both documents are hashed in linear time and the fingerprints compared.
+import os
+import sys
 
-# Opening two text files at the same time using 'with'
-# - 'with' ensures the files are automatically closed after use
-# - we open doc1.txt as first_file, and doc2.txt as second_file
-with open('doc1.txt', 'r') as first_file, open('doc2.txt', 'r') as second_file:
+# The engine lives in plagiarismDetectors/, so add that folder to the import path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "plagiarismDetectors"))
 
-    # Reading the full content of both text files into strings
-    file1 = first_file.read()
-    file2 = second_file.read()
+from documents import read_document
+from fingerprint_store import FingerprintStore
+from incremental import IncrementalChecker
+from normalization import Normalizer
 
-    # Creating a SequenceMatcher object and getting similarity ratio
-    # Parameters:
-    #   None → no custom ignore function
-    #   file1, file2 → the two strings (documents) we want to compare
-    # .ratio() returns a float between 0.0 and 1.0
-    ab = SequenceMatcher(None, file1, file2).ratio()
+# Reading the reference file as a normalized string
+# (accents, case, punctuation and extra whitespace removed).
+# The normalized text is cached in normalized_cache/, keyed by a hash of the
+# file, so re-checking an unchanged file skips normalization completely.
+normalizer = Normalizer()
+file1 = read_document('doc1.txt')   # split into paragraphs, so read it raw
+file2 = normalizer.normalize_file('doc2.txt')
 
-    # Multiply by 100 to convert the ratio into a percentage
-    # Convert float to int so result looks clean (e.g., 87.52 → 87)
-    result = int(ab * 100)
+# Fingerprints are saved in the fingerprint_db folder, keyed by a hash of the
+# text, so a document is only fingerprinted the first time it is checked.
+# doc1 is checked paragraph by paragraph: when a student resubmits a draft,
+# only the edited paragraphs are fingerprinted and scored again, the scores
+# of unchanged paragraphs come from paragraph_scores.sqlite3.
+# Returns:
+#   jaccard     → overlap of the two documents (0.0 - 1.0)
+#   containment → how much of doc1 is found in doc2 (0.0 - 1.0)
+with FingerprintStore('fingerprint_db') as store, \
+        IncrementalChecker(store, normalizer) as checker:
+    check = checker.check(file1, file2)
+similarity = check.similarity
 
-    # Display the similarity result as "xx% Plagiarized Content"
-    print(f"{result}% Plagiarized Content")
+# Multiply by 100 to convert the ratio into a percentage
+# Convert float to int so result looks clean (e.g., 87.52 → 87)
+result = int(similarity.containment * 100)
+
+# Display the similarity result as "xx% Plagiarized Content"
+print(f"{result}% Plagiarized Content")
+print(f"Overall overlap (Jaccard): {similarity.jaccard*100:.2f}%")
+print(f"{check.rescored} of {len(check.paragraphs)} paragraphs re-scored")
@@ -1,18 +1,37 @@
+import os
+import sys
+from itertools import islice
 from googlesearch import search
 import requests
-from bs4 import BeautifulSoup
-from difflib import SequenceMatcher
+
+# The scoring cascade and HTML extractor live one folder up, in plagiarismDetectors/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cascade import ScoringCascade
+from html_text import CHUNK, MAX_PAGE_BYTES, iter_text
 
 text = "This is a sample sentence to check online."
 similarity_scores = []
 
+# Only the best page matters, so every page just has to beat the best score
+# so far: cheap bounds (length, character counts, quick_ratio) throw most
+# pages out before the slow SequenceMatcher.ratio() is run
+cascade = ScoringCascade(threshold=0.0)
+text_profile = cascade.profile(text)
+
 for url in search(text, num=3, stop=3):
     try:
-        r = requests.get(url)
-        soup = BeautifulSoup(r.text, 'html.parser')
-        webpage_text = soup.get_text()
-        score = SequenceMatcher(None, text, webpage_text).ratio()
-        similarity_scores.append(score)
+        # Stream the page: HTML is parsed as it arrives, boilerplate (scripts,
+        # menus, footers...) is dropped, and at most MAX_PAGE_BYTES are read
+        r = requests.get(url, stream=True, timeout=5)
+        r.encoding = r.encoding or "utf-8"
+        chunks = r.iter_content(CHUNK, decode_unicode=True)
+        webpage_text = "".join(iter_text(islice(chunks, MAX_PAGE_BYTES // CHUNK)))
+        r.close()
+        best = max(similarity_scores, default=0.0)
+        score = cascade.score(text_profile, webpage_text, threshold=best)
+        if score is not None:
+            similarity_scores.append(score)
     except:
         continue
 
@@ -20,3 +39,4 @@ if similarity_scores:
     print(f"Max similarity found: {max(similarity_scores)*100:.2f}%")
 else:
     print("No matches found online.")
+print(cascade.report())
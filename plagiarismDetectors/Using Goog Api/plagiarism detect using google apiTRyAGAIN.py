@@ -1,17 +1,16 @@
+import os
+import sys
 import tkinter as tk
-from tkinter import filedialog
-from difflib import SequenceMatcher
-from googlesearch import search
-import requests
-from bs4 import BeautifulSoup
-import nltk
-
-# --- Make sure you have nltk punkt tokenizer ---
-# pip install nltk
-# nltk.download('punkt')
-from nltk.tokenize import sent_tokenize
+from tkinter import filedialog, ttk
+
+# Shared plagiarism engines live one folder up, in plagiarismDetectors/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import service_client
+from gui_worker import BackgroundTask
 
 file_path = ""
+current_task = None
 
 # --- Functions ---
 def select_file():
@@ -20,43 +19,108 @@ def select_file():
     label_file.config(text=file_path)
 
 def check_online_plagiarism():
+    global current_task
     if not file_path:
         result_label.config(text="⚠️ Please select a file")
         return
 
+    # Searching and fetching run on a worker thread so the window stays
+    # responsive; results come back through BackgroundTask's after() polling
+    current_task = BackgroundTask(root, run_check, on_progress=show_progress,
+                                  on_partial=show_partial, on_done=show_result,
+                                  on_error=show_error, on_cancelled=show_cancelled)
+    check_button.config(state="disabled")
+    cancel_button.config(state="normal")
+    result_label.config(text="Checking...")
+    current_task.start()
+
+def run_check(task):
+    """Worker thread: search, fetch and score every sentence of the file."""
     with open(file_path, "r") as f:
         text = f.read()
 
-    sentences = sent_tokenize(text)
-    max_scores = []
-
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if len(sentence) < 20:
-            continue  # skip very short sentences
-
-        scores = []
-        try:
-            for url in search(sentence, num=2, stop=2, pause=2):
-                try:
-                    r = requests.get(url, timeout=3)
-                    soup = BeautifulSoup(r.text, 'html.parser')
-                    webpage_text = soup.get_text()
-                    score = SequenceMatcher(None, sentence, webpage_text).ratio()
-                    scores.append(score)
-                except:
-                    continue
-            if scores:
-                max_scores.append(max(scores))
-        except:
-            continue
+    def report(done, total, status, sentences, matches):
+        task.progress(done, total, status)
+        task.partial((sentences, matches))
+
+    # The local service (plagiarism_service.py) keeps nltk, the page cache and
+    # its connections warm between checks; without it, check in this process
+    try:
+        sentences, matches, stats = service_client.check_online(
+            text, progress=report, should_stop=task.cancel_event.is_set)
+    except service_client.ServiceUnavailable:
+        sentences, matches, stats = check_locally(task, text)
+    task.check_cancelled()
+    return sentences, matches, stats
+
+def check_locally(task, text):
+    # Imported here so the window opens without loading nltk
+    from online_check import check_text_online
+    from page_cache import PageCache
+
+    def report(done, total, sentences, matches):
+        task.progress(done, total, f"{done}/{total} searches and pages")
+        task.partial((sentences, matches))
+
+    # Fetched pages are cached as plain text in page_cache/ (re-checked after a
+    # week), so cached pages need no download and no parsing
+    with PageCache("page_cache") as page_cache:
+        return check_text_online(text, page_cache, progress=report,
+                                 should_stop=task.cancel_event.is_set)
+
+def show_progress(done, total, text):
+    progress_bar.config(maximum=max(total, 1), value=done)
+    status_label.config(text=text)
+
+def show_partial(result):
+    sentences, matches = result
+    show_similarity(matches)
+    show_matches(sentences, matches)
 
+def show_result(result):
+    sentences, matches, stats = result
+    show_partial((sentences, matches))
+    if stats:
+        status_label.config(text=f"Done - {stats.sent} searches for {stats.sentences} sentences "
+                                 f"({stats.skipped} skipped as already found), "
+                                 f"{stats.duplicate_pages} duplicate page(s) not scored")
+    else:
+        status_label.config(text="Done")
+    finish_check()
+
+def show_similarity(matches):
+    max_scores = [match.score for match in matches if match.url]
     if max_scores:
         overall_similarity = sum(max_scores)/len(max_scores) * 100
         result_label.config(text=f"Estimated Online Similarity: {overall_similarity:.2f}%")
     else:
         result_label.config(text="No matches found online.")
 
+def show_error(error):
+    result_label.config(text=f"⚠️ Error: {error}")
+    finish_check()
+
+def show_cancelled():
+    status_label.config(text="Cancelled - showing partial results")
+    finish_check()
+
+def cancel_check():
+    if current_task:
+        current_task.cancel()
+        status_label.config(text="Cancelling...")
+
+def finish_check():
+    check_button.config(state="normal")
+    cancel_button.config(state="disabled")
+
+def show_matches(sentences, matches):
+    """List each sentence's best match (score and URL), best first."""
+    matches_box.delete("1.0", tk.END)
+    ranked = sorted(zip(matches, sentences), key=lambda item: item[0].score, reverse=True)
+    for match, sentence in ranked:
+        if match.url:
+            matches_box.insert(tk.END, f"{match.score*100:5.1f}%  {match.url}\n        {sentence[:80]}\n")
+
 # --- GUI ---
 root = tk.Tk()
 root.title("Online Plagiarism Detector")
@@ -65,8 +129,18 @@ tk.Button(root, text="Select File", command=select_file).pack(pady=5)
 label_file = tk.Label(root, text="No file selected")
 label_file.pack()
 
-tk.Button(root, text="Check Online Plagiarism", command=check_online_plagiarism).pack(pady=10)
+check_button = tk.Button(root, text="Check Online Plagiarism", command=check_online_plagiarism)
+check_button.pack(pady=10)
+cancel_button = tk.Button(root, text="Cancel", command=cancel_check, state="disabled")
+cancel_button.pack()
+progress_bar = ttk.Progressbar(root, length=300, mode="determinate")
+progress_bar.pack(pady=5)
+status_label = tk.Label(root, text="")
+status_label.pack()
 result_label = tk.Label(root, text="")
 result_label.pack()
 
+matches_box = tk.Text(root, wrap="none", width=100, height=15)
+matches_box.pack(fill="both", expand=True, padx=5, pady=5)
+
 root.mainloop()
@@ -1,10 +1,22 @@
+import os
+import sys
 import tkinter as tk
-from tkinter import filedialog
-from difflib import SequenceMatcher
+from tkinter import filedialog, ttk
+
+# Shared plagiarism engines live one folder up, in plagiarismDetectors/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import service_client
+from documents import read_document
+from gui_worker import BackgroundTask
+from normalization import Normalizer
+from passages import common_passages, highlight_spans
+from winnowing import compare_documents
 
 # --- Global variables to hold file paths ---
 file1_path = ""
 file2_path = ""
+current_task = None
 
 # --- Functions ---
 def select_file1():
@@ -18,16 +30,100 @@ def select_file2():
     label_file2.config(text=file2_path)
 
 def check_plagiarism():
+    global current_task
     if not file1_path or not file2_path:
         result_label.config(text="⚠️ Please select both files")
         return
 
-    with open(file1_path, "r") as f1, open(file2_path, "r") as f2:
-        text1 = f1.read()
-        text2 = f2.read()
+    # The comparison runs on a worker thread so the window stays responsive;
+    # results come back to the Tk main loop through BackgroundTask's polling
+    current_task = BackgroundTask(root, run_check, on_progress=show_progress,
+                                  on_partial=show_score, on_done=show_passages,
+                                  on_error=show_error, on_cancelled=show_cancelled)
+    check_button.config(state="disabled")
+    cancel_button.config(state="normal")
+    result_label.config(text="Checking...")
+    current_task.start()
+
+def run_check(task):
+    """Worker thread: score the documents, then find the shared passages."""
+    task.progress(0, 3, "Reading files...")
+    text1 = read_document(file1_path)
+    text2 = read_document(file2_path)
+
+    # If the local service (plagiarism_service.py) is running it does the
+    # work with its warm fingerprint store; otherwise check in this process
+    try:
+        task.progress(1, 3, "Checking on the local service...")
+        similarity, passages = service_client.compare(text1, text2)
+        task.check_cancelled()
+        task.progress(3, 3, "Done")
+        return text1, text2, similarity, passages
+    except service_client.ServiceUnavailable:
+        pass
+
+    # Scores use normalized text (cached per file content); the raw text is
+    # kept for showing and highlighting the passages
+    normalizer = Normalizer()
+    normalized1 = normalizer.normalize_file(file1_path)
+    normalized2 = normalizer.normalize_file(file2_path)
+    task.check_cancelled()
+
+    task.progress(1, 3, "Comparing fingerprints...")
+    similarity = compare_documents(normalized1, normalized2)
+    task.partial(similarity)
+    task.check_cancelled()
+
+    task.progress(2, 3, "Finding matching passages...")
+    passages = common_passages(text1, text2)
+    task.check_cancelled()
+    task.progress(3, 3, "Done")
+    return text1, text2, similarity, passages
+
+def show_progress(done, total, text):
+    progress_bar.config(maximum=total, value=done)
+    status_label.config(text=text)
 
-    similarity = SequenceMatcher(None, text1, text2).ratio()
-    result_label.config(text=f"Plagiarism: {similarity*100:.2f}%")
+def show_score(similarity):
+    result_label.config(text=f"Plagiarism: {similarity.containment*100:.2f}% "
+                             f"(overlap {similarity.jaccard*100:.2f}%)")
+
+def show_passages(result):
+    text1, text2, similarity, passages = result
+    result_label.config(text=f"Plagiarism: {similarity.containment*100:.2f}% "
+                             f"(overlap {similarity.jaccard*100:.2f}%), "
+                             f"{len(passages)} matching passage(s)")
+
+    spans1, spans2 = highlight_spans(passages)
+    show_text(text_view1, text1, spans1)
+    show_text(text_view2, text2, spans2)
+    finish_check()
+
+def show_error(error):
+    result_label.config(text=f"⚠️ Error: {error}")
+    finish_check()
+
+def show_cancelled():
+    status_label.config(text="Cancelled")
+    finish_check()
+
+def cancel_check():
+    if current_task:
+        current_task.cancel()
+        status_label.config(text="Cancelling...")
+
+def finish_check():
+    check_button.config(state="normal")
+    cancel_button.config(state="disabled")
+
+def show_text(view, text, spans):
+    """Show a document in a Text widget with the matched passages highlighted."""
+    view.config(state="normal")
+    view.delete("1.0", tk.END)
+    view.insert("1.0", text)
+    for start, end in spans:
+        view.tag_add("match", f"1.0 + {start} chars", f"1.0 + {end} chars")
+    view.config(state="disabled")
 
 # --- GUI ---
 root = tk.Tk()
@@ -41,8 +137,25 @@ tk.Button(root, text="Select Second File", command=select_file2).pack(pady=5)
 label_file2 = tk.Label(root, text="No file selected")
 label_file2.pack()
 
-tk.Button(root, text="Check Plagiarism", command=check_plagiarism).pack(pady=10)
+check_button = tk.Button(root, text="Check Plagiarism", command=check_plagiarism)
+check_button.pack(pady=10)
+cancel_button = tk.Button(root, text="Cancel", command=cancel_check, state="disabled")
+cancel_button.pack()
+progress_bar = ttk.Progressbar(root, length=300, mode="determinate")
+progress_bar.pack(pady=5)
+status_label = tk.Label(root, text="")
+status_label.pack()
 result_label = tk.Label(root, text="")
 result_label.pack()
 
+# --- Side-by-side document views, copied passages highlighted in yellow ---
+views = tk.Frame(root)
+views.pack(fill="both", expand=True, padx=5, pady=5)
+text_view1 = tk.Text(views, wrap="word", width=60, height=25, state="disabled")
+text_view1.pack(side="left", fill="both", expand=True)
+text_view2 = tk.Text(views, wrap="word", width=60, height=25, state="disabled")
+text_view2.pack(side="left", fill="both", expand=True)
+for view in (text_view1, text_view2):
+    view.tag_configure("match", background="yellow")
+
 root.mainloop()
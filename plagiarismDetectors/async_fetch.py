@@ -0,0 +1,258 @@
+"""
+Asynchronous page fetcher for the online plagiarism checker.
+
+The checker used to call requests.get(url, timeout=3) for one search result
+after another, so most of a check was spent waiting on the network. Here every
+page is downloaded concurrently with asyncio:
+
+ - a global concurrency limit (CONCURRENCY requests in flight at once)
+ - a small pool of keep-alive connections per host, reused between requests
+ - a hard per-request deadline (connect + send + read, over all redirects);
+   time spent queued for a free slot doesn't count against it
+
+Only the standard library is used (asyncio streams + ssl), so it works against
+any HTTP/1.1 server - including a throwaway local one for testing;
+check_async_fetch.py runs keep-alive, chunked, redirect and deadline checks
+against one started in-process.
+"""
+
+import asyncio
+import ssl
+from collections import defaultdict, namedtuple
+from urllib.parse import urljoin, urlsplit
+
+# --- Settings ---
+CONCURRENCY = 20        # requests in flight at once, across all hosts
+PER_HOST = 4            # open connections per host
+TIMEOUT = 5.0           # seconds allowed for one whole request
+MAX_REDIRECTS = 5
+MAX_BODY = 2 * 1024 * 1024     # bytes of body read per page; the rest is dropped
+USER_AGENT = "Mozilla/5.0 (plagiarism-checker)"
+
+Response = namedtuple("Response", ["url", "status", "headers", "body"])
+Response.__doc__ = """A fetched page.
+url     - final URL after redirects
+status  - HTTP status code
+headers - dict of lowercase header names -> values
+body    - raw body bytes (at most max_body of them)
+"""
+
+
+class FetchError(Exception):
+    """Raised when a page can't be fetched (bad URL, protocol error, ...)."""
+
+
+def decode_body(response):
+    """Decode a response body using the charset from its Content-Type."""
+    charset = "utf-8"
+    for part in response.headers.get("content-type", "").split(";"):
+        name, _, value = part.strip().partition("=")
+        if name.lower() == "charset" and value:
+            charset = value.strip("\"'")
+    try:
+        return response.body.decode(charset, errors="replace")
+    except LookupError:
+        return response.body.decode("utf-8", errors="replace")
+
+
+class AsyncFetcher:
+    """Concurrent HTTP/1.1 fetcher with per-host keep-alive connection pools.
+
+        async with AsyncFetcher() as fetcher:
+            responses = await fetcher.fetch_all(urls)
+    """
+
+    def __init__(self, concurrency=CONCURRENCY, per_host=PER_HOST, timeout=TIMEOUT,
+                 max_body=MAX_BODY):
+        self.timeout = timeout
+        self.max_body = max_body
+        self.per_host = per_host
+        self._limit = asyncio.Semaphore(concurrency)
+        self._host_limits = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        self._idle = defaultdict(list)  # (scheme, host, port) -> [(reader, writer)]
+        self._ssl = ssl.create_default_context()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # --- Connections ---
+    async def _connect(self, origin):
+        scheme, host, port = origin
+        return await asyncio.open_connection(
+            host, port, ssl=self._ssl if scheme == "https" else None)
+
+    def _release(self, origin, conn, reusable):
+        if reusable and len(self._idle[origin]) < self.per_host:
+            self._idle[origin].append(conn)
+        else:
+            conn[1].close()
+
+    async def close(self):
+        """Close every idle keep-alive connection."""
+        for conns in self._idle.values():
+            for _, writer in conns:
+                writer.close()
+        self._idle.clear()
+
+    # --- HTTP ---
+    async def _read_body(self, reader, headers):
+        """(body, complete). Reading stops after max_body bytes; the connection
+        is then not complete and won't be reused."""
+        limit = self.max_body if self.max_body is not None else float("inf")
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            received = 0
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Skip trailers up to the blank line
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return b"".join(chunks), True
+                if received + size > limit:
+                    chunks.append(await reader.readexactly(int(limit - received)))
+                    return b"".join(chunks), False
+                chunks.append(await reader.readexactly(size))
+                received += size
+                await reader.readline()
+        if "content-length" in headers:
+            length = int(headers["content-length"])
+            if length > limit:
+                return await reader.readexactly(int(limit)), False
+            return await reader.readexactly(length), True
+        # Body ends when the server closes
+        chunks = []
+        received = 0
+        while received < limit:
+            chunk = await reader.read(min(64 * 1024, limit - received))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            received += len(chunk)
+        return b"".join(chunks), False
+
+    async def _request_once(self, conn, method, url, parts, extra_headers):
+        reader, writer = conn
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        lines = [f"{method} {path} HTTP/1.1",
+                 f"Host: {parts.netloc}",
+                 f"User-Agent: {USER_AGENT}",
+                 "Accept-Encoding: identity",
+                 "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in (extra_headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before response")
+        try:
+            version, status = status_line.decode("latin-1").split()[:2]
+            status = int(status)
+        except ValueError:
+            raise FetchError(f"bad status line from {url!r}: {status_line!r}")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body, complete = b"", True
+        else:
+            body, complete = await self._read_body(reader, headers)
+        reusable = (complete and version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close")
+        return Response(url, status, headers, body), reusable
+
+    async def _request(self, method, url, headers, budget):
+        """(response, budget left): one request, given budget seconds once it has its slots."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise FetchError(f"unsupported URL: {url!r}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        origin = (parts.scheme, parts.hostname, port)
+
+        # Host slot first, then a global one: a request queued behind a busy
+        # host doesn't hold a global slot that requests to other hosts could use
+        async with self._host_limits[origin]:
+            async with self._limit:
+                loop = asyncio.get_running_loop()
+                start = loop.time()
+                response = await asyncio.wait_for(
+                    self._exchange(origin, method, url, parts, headers), budget)
+                if budget is not None:
+                    budget -= loop.time() - start
+                return response, budget
+
+    async def _exchange(self, origin, method, url, parts, headers):
+        # A pooled connection may have been closed by the server while
+        # idle; in that case fall through to the next one / a fresh one.
+        while self._idle[origin]:
+            conn = self._idle[origin].pop()
+            try:
+                return await self._send(origin, conn, method, url, parts, headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                continue
+        conn = await self._connect(origin)
+        return await self._send(origin, conn, method, url, parts, headers)
+
+    async def _send(self, origin, conn, method, url, parts, headers):
+        try:
+            response, reusable = await self._request_once(conn, method, url, parts, headers)
+        except BaseException:
+            conn[1].close()     # also on timeout/cancel: never pool a half-read socket
+            raise
+        self._release(origin, conn, reusable)
+        return response
+
+    async def fetch(self, url, headers=None, method="GET"):
+        """Fetch one URL (following redirects) within the per-request deadline.
+
+        The deadline only runs while connecting, sending and reading, not
+        while the request waits for a host or global slot.
+        """
+        budget = self.timeout
+        for _ in range(MAX_REDIRECTS + 1):
+            response, budget = await self._request(method, url, headers, budget)
+            if response.status in (301, 302, 303, 307, 308) and "location" in response.headers:
+                url = urljoin(url, response.headers["location"])
+                continue
+            return response
+        raise FetchError(f"too many redirects: {url!r}")
+
+    async def fetch_all(self, urls, headers=None):
+        """Fetch all URLs concurrently -> {url: Response or None on failure}."""
+        urls = list(dict.fromkeys(urls))    # drop duplicates, keep order
+
+        async def fetch_or_none(url):
+            try:
+                return await self.fetch(url, headers)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                    FetchError, ValueError):
+                return None
+
+        responses = await asyncio.gather(*(fetch_or_none(url) for url in urls))
+        return dict(zip(urls, responses))
+
+
+def fetch_pages(urls, **fetcher_options):
+    """Blocking helper: download all URLs concurrently -> {url: text}.
+
+    Pages that fail or don't return 200 are left out.
+    """
+    async def run():
+        async with AsyncFetcher(**fetcher_options) as fetcher:
+            return await fetcher.fetch_all(urls)
+
+    responses = asyncio.run(run())
+    return {url: decode_body(response) for url, response in responses.items()
+            if response is not None and response.status == 200}
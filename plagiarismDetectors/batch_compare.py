@@ -0,0 +1,138 @@
+"""
+Batch mode: compare every document in a folder with every other one.
+
+End-of-term checks used to be a single-threaded SequenceMatcher loop over all
+pairs. This script spreads the work over all CPU cores:
+
+ 1. preprocessing - every document is fingerprinted once (in parallel) and
+    written to the memory-mapped FingerprintStore
+ 2. scoring       - the pair matrix is cut into square tiles and each worker
+    scores whole tiles. Workers read fingerprints straight from the store's
+    mmap'd files (shared through the OS page cache), so no document text or
+    fingerprint is pickled per pair - a task is just two index ranges.
+
+Usage:
+    python batch_compare.py <folder> <output.csv|output.json>
+        [--metric jaccard|containment] [--workers N] [--store FOLDER]
+"""
+
+import argparse
+import csv
+import json
+import os
+from multiprocessing import Pool
+
+from documents import list_documents, read_document
+from fingerprint_store import FingerprintStore, document_key
+from winnowing import fingerprint_set
+
+# --- Settings ---
+TILE = 64               # documents per tile side; a task scores up to TILE*TILE pairs
+STORE_FOLDER = "fingerprint_db"
+
+
+# --- Worker side ---
+_store = None
+_keys = None
+
+
+def _fingerprint_file(path):
+    """Worker: fingerprint one document -> (key, fingerprint hashes)."""
+    text = read_document(path)
+    return document_key(text), fingerprint_set(text)
+
+
+def _init_scorer(store_folder, keys):
+    """Worker initializer: open the store once; keys arrive once per worker."""
+    global _store, _keys
+    _store = FingerprintStore(store_folder)
+    _keys = keys
+
+
+def _score_tile(tile):
+    """Worker: shared-fingerprint counts for every pair i < j inside one tile."""
+    (i0, i1), (j0, j1) = tile
+    rows = [set(_store.fingerprints(_keys[i])) for i in range(i0, i1)]
+    cols = rows if (i0, i1) == (j0, j1) else [set(_store.fingerprints(_keys[j]))
+                                              for j in range(j0, j1)]
+    results = []
+    for i in range(i0, i1):
+        a = rows[i - i0]
+        for j in range(max(j0, i + 1), j1):
+            results.append((i, j, len(a & cols[j - j0])))
+    return results
+
+
+# --- Driver ---
+def _tiles(n, tile=TILE):
+    """Upper-triangle tiles ((i0, i1), (j0, j1)) covering all pairs i < j."""
+    bounds = [(start, min(start + tile, n)) for start in range(0, n, tile)]
+    for a, rows in enumerate(bounds):
+        for cols in bounds[a:]:
+            yield rows, cols
+
+
+def similarity_matrix(paths, metric="jaccard", workers=None, store_folder=STORE_FOLDER):
+    """N x N similarity matrix (lists of floats) for the given documents.
+
+    metric "jaccard" is symmetric; for "containment", matrix[i][j] is how much
+    of document i is found in document j.
+    """
+    if metric not in ("jaccard", "containment"):
+        raise ValueError(f"unknown metric: {metric}")
+
+    with Pool(workers) as pool, FingerprintStore(store_folder) as store:
+        # 1. Preprocess: fingerprint only documents the store hasn't seen yet
+        keys = [document_key(read_document(path)) for path in paths]
+        missing = [path for path, key in zip(paths, keys) if store.fingerprints(key) is None]
+        for key, fingerprints in pool.imap_unordered(_fingerprint_file, missing, chunksize=8):
+            store.put(key, fingerprints)
+        sizes = [len(store.fingerprints(key)) for key in keys]
+
+    n = len(paths)
+    matrix = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        matrix[i][i] = 1.0 if sizes[i] else 0.0
+
+    # 2. Score: workers open the finished store themselves
+    with Pool(workers, initializer=_init_scorer, initargs=(store_folder, keys)) as pool:
+        for results in pool.imap_unordered(_score_tile, _tiles(n)):
+            for i, j, shared in results:
+                if metric == "jaccard":
+                    union = sizes[i] + sizes[j] - shared
+                    matrix[i][j] = matrix[j][i] = shared / union if union else 0.0
+                else:
+                    matrix[i][j] = shared / sizes[i] if sizes[i] else 0.0
+                    matrix[j][i] = shared / sizes[j] if sizes[j] else 0.0
+    return matrix
+
+
+def write_matrix(output_path, paths, matrix, metric):
+    """Write the matrix as CSV (header row of names) or JSON, by extension."""
+    names = [os.path.basename(path) for path in paths]
+    if output_path.lower().endswith(".json"):
+        with open(output_path, "w") as f:
+            json.dump({"metric": metric, "documents": names, "matrix": matrix}, f)
+    else:
+        with open(output_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["document"] + names)
+            for name, row in zip(names, matrix):
+                writer.writerow([name] + [f"{value:.4f}" for value in row])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pairwise plagiarism matrix for a folder")
+    parser.add_argument("folder")
+    parser.add_argument("output", help="output file, .csv or .json")
+    parser.add_argument("--metric", choices=["jaccard", "containment"], default="jaccard")
+    parser.add_argument("--workers", type=int, default=None, help="default: all CPU cores")
+    parser.add_argument("--store", default=STORE_FOLDER, help="fingerprint store folder")
+    args = parser.parse_args()
+
+    documents = list_documents(args.folder)
+    print(f"Comparing {len(documents)} documents "
+          f"({len(documents) * (len(documents) - 1) // 2} pairs)...")
+    result = similarity_matrix(documents, args.metric, args.workers, args.store)
+    write_matrix(args.output, documents, result, args.metric)
+    print(f"Saved {args.metric} matrix to {args.output}")
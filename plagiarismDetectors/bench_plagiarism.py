@@ -0,0 +1,271 @@
+"""
+Benchmark suite for the plagiarism scoring engines.
+
+Generates synthetic corpora with a controlled document length and copy rate,
+then times every scoring backend on the same document pairs:
+
+    sequencematcher  - difflib SequenceMatcher.ratio() (the original scripts)
+    cascade          - the same ratio() behind cascade.py's cheap bounds
+                       (pairs below CASCADE_THRESHOLD are rejected early)
+    winnowing        - winnowing.compare_documents()
+    minhash          - MinHash signatures + estimate_jaccard()
+    passages         - passages.common_passages()
+    lsh_query        - one corpus-wide LSH lookup per pair (index build excluded)
+
+For each backend it reports throughput (pairs/s and MB/s), latency percentiles
+and peak traced memory. After a warm-up call every backend is timed --repeats
+times. Throughput comes from the fastest pass, so one noisy pass (another
+process, a cold cache) doesn't look like a regression. Percentiles are taken
+over every timed call of every pass, so they still show the slow tail. Results can be saved as a baseline and
+later runs compared against it, so regressions show up:
+
+    python bench_plagiarism.py --sizes 1k,10k,100k --docs 50 --save baseline.json
+    python bench_plagiarism.py --sizes 1k,10k,100k --docs 50 --compare baseline.json
+
+Corpora go up to 10 MB documents and 100k documents, but sequencematcher is
+quadratic-ish: it and cascade are skipped above --max-seqmatch-size.
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from difflib import SequenceMatcher
+
+from cascade import ScoringCascade
+from minhash_lsh import LSHIndex, document_signature, estimate_jaccard
+from passages import common_passages
+from winnowing import compare_documents
+
+# --- Settings ---
+SEED = 42
+VOCABULARY = 20000          # distinct synthetic words
+REGRESSION = 1.25           # flag a backend that got 25% slower than baseline
+MAX_SEQMATCH_SIZE = 100_000
+MEMORY_SAMPLES = 3          # pairs re-run under tracemalloc for peak memory
+REPEATS = 5                 # timed passes per backend; the fastest sets throughput
+CASCADE_THRESHOLD = 0.5
+
+
+# --- Synthetic corpora ---
+def _vocabulary(rng, size=VOCABULARY):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(2, 10))) for _ in range(size)]
+
+
+def make_text(rng, words, length):
+    """Random text of about length characters, in sentences."""
+    parts = []
+    total = 0
+    while total < length:
+        sentence = " ".join(rng.choices(words, k=rng.randint(8, 20))).capitalize() + "."
+        parts.append(sentence)
+        total += len(sentence) + 1
+    return " ".join(parts)[:length]
+
+
+def make_copy(rng, words, source, copy_rate):
+    """Text the same length as source with copy_rate of it lifted from source.
+
+    The copied part is split into a few passages so it isn't one single block.
+    """
+    length = len(source)
+    copied = int(length * copy_rate)
+    pieces = []
+    remaining = copied
+    while remaining > 0:
+        size = min(remaining, max(200, copied // 4))
+        start = rng.randrange(0, max(1, length - size))
+        pieces.append(source[start:start + size])
+        remaining -= size
+    filler = make_text(rng, words, max(0, length - copied))
+    # Interleave copied pieces with original filler
+    chunks = len(pieces) + 1
+    step = max(1, len(filler) // chunks)
+    out = []
+    for i, piece in enumerate(pieces):
+        out.append(filler[i * step:(i + 1) * step])
+        out.append(piece)
+    out.append(filler[len(pieces) * step:])
+    return " ".join(out)
+
+
+def make_corpus(length, docs, copy_rate, seed=SEED):
+    """(documents, pairs): docs texts of ~length chars; pairs (i, j) share copy_rate."""
+    rng = random.Random(seed)
+    words = _vocabulary(rng)
+    texts = []
+    pairs = []
+    while len(texts) < docs:
+        source = make_text(rng, words, length)
+        texts.append(source)
+        if len(texts) < docs:
+            texts.append(make_copy(rng, words, source, copy_rate))
+            pairs.append((len(texts) - 2, len(texts) - 1))
+    return texts, pairs
+
+
+def parse_size(text):
+    """'1k' -> 1000, '10m' -> 10000000, '500' -> 500."""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+# --- Backends ---
+def _bench_sequencematcher(texts, pairs):
+    return [lambda a=texts[i], b=texts[j]: SequenceMatcher(None, a, b).ratio() for i, j in pairs]
+
+
+def _bench_cascade(texts, pairs):
+    cascade = ScoringCascade(CASCADE_THRESHOLD)
+    profiles = [cascade.profile(text) for text in texts]    # once per document
+    return [lambda a=profiles[i], b=profiles[j]: cascade.score(a, b) for i, j in pairs]
+
+
+def _bench_winnowing(texts, pairs):
+    return [lambda a=texts[i], b=texts[j]: compare_documents(a, b) for i, j in pairs]
+
+
+def _bench_minhash(texts, pairs):
+    return [lambda a=texts[i], b=texts[j]: estimate_jaccard(document_signature(a),
+                                                           document_signature(b))
+            for i, j in pairs]
+
+
+def _bench_passages(texts, pairs):
+    return [lambda a=texts[i], b=texts[j]: common_passages(a, b) for i, j in pairs]
+
+
+def _bench_lsh_query(texts, pairs):
+    index = LSHIndex()
+    for number, text in enumerate(texts):
+        index.add(number, document_signature(text))
+    return [lambda a=texts[i]: index.query(document_signature(a)) for i, _ in pairs]
+
+
+BACKENDS = {
+    "sequencematcher": _bench_sequencematcher,
+    "cascade": _bench_cascade,
+    "winnowing": _bench_winnowing,
+    "minhash": _bench_minhash,
+    "passages": _bench_passages,
+    "lsh_query": _bench_lsh_query,
+}
+
+
+# --- Measuring ---
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def run_backend(name, texts, pairs, memory_samples=MEMORY_SAMPLES, repeats=REPEATS):
+    """Time one backend on all pairs -> dict of metrics.
+
+    Throughput is from the fastest of repeats passes; latency percentiles are
+    over all timed calls (taking each pair's fastest call would hide the tail).
+    """
+    calls = BACKENDS[name](texts, pairs)
+    if calls:
+        calls[0]()      # warm-up: imports, caches, first-call allocations
+    elapsed = float("inf")
+    latencies = []
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        for call in calls:
+            t0 = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - t0)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    # tracemalloc slows every allocation down a lot, so peak memory is
+    # measured in a separate pass over a few pairs, not during the timing
+    peak = 0
+    for call in calls[:memory_samples]:
+        tracemalloc.start()
+        call()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    scored_bytes = sum(len(texts[i]) + len(texts[j]) for i, j in pairs)
+    return {
+        "pairs": len(pairs),
+        "pairs_per_s": len(pairs) / elapsed if elapsed else 0.0,
+        "mb_per_s": scored_bytes / 1e6 / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_mb": peak / 1e6,
+        "repeats": max(1, repeats),
+    }
+
+
+def run_suite(sizes, docs, copy_rate, backends, max_seqmatch_size=MAX_SEQMATCH_SIZE,
+              repeats=REPEATS):
+    """{"<size>/<backend>": metrics} for every size and backend."""
+    results = {}
+    for size in sizes:
+        texts, pairs = make_corpus(size, docs, copy_rate)
+        for name in backends:
+            if name in ("sequencematcher", "cascade") and size > max_seqmatch_size:
+                continue
+            key = f"{size}/{name}"
+            results[key] = run_backend(name, texts, pairs, repeats=repeats)
+            m = results[key]
+            print(f"{key:<24} {m['pairs_per_s']:10.1f} pairs/s {m['mb_per_s']:8.2f} MB/s  "
+                  f"p50 {m['p50_ms']:9.2f} ms  p99 {m['p99_ms']:9.2f} ms  "
+                  f"peak {m['peak_mb']:8.2f} MB")
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=REGRESSION):
+    """Print the change against a saved run; returns the list of regressions."""
+    regressions = []
+    print("\nAgainst baseline:")
+    for key, m in results.items():
+        old = baseline.get(key)
+        if not old:
+            continue
+        slower = old["pairs_per_s"] / m["pairs_per_s"] if m["pairs_per_s"] else float("inf")
+        fatter = m["peak_mb"] / old["peak_mb"] if old["peak_mb"] else 1.0
+        flag = ""
+        if slower > tolerance or fatter > tolerance:
+            flag = "  <-- REGRESSION"
+            regressions.append(key)
+        print(f"{key:<24} speed x{1 / slower:5.2f}  memory x{fatter:5.2f}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the plagiarism scoring engines")
+    parser.add_argument("--sizes", default="1k,10k,100k",
+                        help="comma-separated document lengths, e.g. 1k,100k,10m")
+    parser.add_argument("--docs", type=int, default=20, help="documents per corpus (10 - 100k)")
+    parser.add_argument("--copy-rate", type=float, default=0.3,
+                        help="fraction of each copy taken from its source")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--max-seqmatch-size", type=parse_size, default=MAX_SEQMATCH_SIZE)
+    parser.add_argument("--repeats", type=int, default=REPEATS,
+                        help="timed passes per backend; the fastest is reported and saved")
+    parser.add_argument("--save", help="write results to this JSON baseline file")
+    parser.add_argument("--compare", help="compare against this JSON baseline file")
+    args = parser.parse_args()
+
+    suite = run_suite([parse_size(s) for s in args.sizes.split(",")], args.docs,
+                      args.copy_rate, args.backends.split(","), args.max_seqmatch_size,
+                      args.repeats)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(suite, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        with open(args.compare, "r") as f:
+            found = compare_to_baseline(suite, json.load(f))
+        if found:
+            raise SystemExit(f"{len(found)} regression(s)")
@@ -0,0 +1,145 @@
+"""
+Scoring cascade: cheap upper bounds before SequenceMatcher.ratio().
+
+ratio() is 2*M / (len(a) + len(b)), where M is the number of matching
+characters, and computing M is the expensive part. Every stage below gives an
+upper bound on ratio(); if the bound is already under the threshold the pair
+can't make it, so it's rejected without running the later stages:
+
+    1. length     - M <= min(len(a), len(b))     (= real_quick_ratio())
+    2. histogram  - M <= sum of min(count) over a coarse character histogram
+                    (characters folded into BUCKETS buckets). Histograms are
+                    computed once per text, so this is O(BUCKETS) per pair.
+    3. quick      - SequenceMatcher.quick_ratio(), exact character multiset
+    4. ratio      - the real score; pairs still under the threshold are
+                    counted as rejected at this stage
+
+Merging characters into buckets can only raise the min-count sum, so stage 2
+never rejects a pair that quick_ratio() or ratio() would accept.
+
+Usage:
+    python cascade.py <folder> [--threshold 0.6]
+"""
+
+import argparse
+import os
+from collections import Counter, namedtuple
+from difflib import SequenceMatcher
+
+from documents import iter_documents
+
+# --- Settings ---
+BUCKETS = 64
+THRESHOLD = 0.6
+STAGES = ("length", "histogram", "quick_ratio", "ratio")
+
+Profile = namedtuple("Profile", ["text", "length", "histogram"])
+Profile.__doc__ = "A text with its length and bucketed character histogram, computed once."
+
+
+def profile(text, buckets=BUCKETS):
+    """Profile of text for the cheap stages of the cascade."""
+    histogram = [0] * buckets
+    for ch, count in Counter(text).items():
+        histogram[ord(ch) % buckets] += count
+    return Profile(text, len(text), histogram)
+
+
+class ScoringCascade:
+    """Scores pairs with SequenceMatcher, skipping pairs that can't reach threshold.
+
+        cascade = ScoringCascade(0.6)
+        score = cascade.score(text1, text2)     # None if below 0.6
+        print(cascade.report())
+
+    pruned[stage] counts the pairs rejected at each stage; accepted counts
+    pairs that reached the threshold.
+    """
+
+    def __init__(self, threshold=THRESHOLD, buckets=BUCKETS, autojunk=True):
+        self.threshold = threshold
+        self.buckets = buckets
+        self._matcher = SequenceMatcher(None, autojunk=autojunk)
+        self.pairs = 0
+        self.accepted = 0
+        self.pruned = dict.fromkeys(STAGES, 0)
+
+    def profile(self, text):
+        return profile(text, self.buckets)
+
+    def _reject(self, stage):
+        self.pruned[stage] += 1
+        return None
+
+    def score(self, a, b, threshold=None):
+        """ratio() of a and b, or None if it is below the threshold.
+
+        a and b are texts or Profiles; pass Profiles when a text is compared
+        more than once. Comparing many a's against the same b is fastest,
+        since SequenceMatcher keeps its analysis of b between calls.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        a = a if isinstance(a, Profile) else self.profile(a)
+        b = b if isinstance(b, Profile) else self.profile(b)
+        self.pairs += 1
+        total = a.length + b.length
+        if not total:   # two empty texts are identical, ratio() says 1.0
+            return self._accept(1.0) if threshold <= 1.0 else self._reject("ratio")
+
+        if 2.0 * min(a.length, b.length) / total < threshold:
+            return self._reject("length")
+
+        common = sum(map(min, a.histogram, b.histogram))
+        if 2.0 * common / total < threshold:
+            return self._reject("histogram")
+
+        self._matcher.set_seqs(a.text, b.text)
+        if self._matcher.quick_ratio() < threshold:
+            return self._reject("quick_ratio")
+
+        ratio = self._matcher.ratio()
+        if ratio < threshold:
+            return self._reject("ratio")
+        return self._accept(ratio)
+
+    def _accept(self, ratio):
+        self.accepted += 1
+        return ratio
+
+    def report(self):
+        """One line with the pruning counters."""
+        stages = ", ".join(f"{stage} {self.pruned[stage]}" for stage in STAGES)
+        return f"{self.pairs} pairs: {self.accepted} accepted; pruned by {stages}"
+
+
+def similar_pairs(texts, threshold=THRESHOLD, cascade=None):
+    """[(i, j, ratio)] for every pair i < j of texts with ratio >= threshold.
+
+    Pass a cascade to read its counters afterwards (its threshold is used then).
+    """
+    cascade = cascade or ScoringCascade(threshold)
+    profiles = [cascade.profile(text) for text in texts]
+    found = []
+    # b stays fixed in the inner loop, so SequenceMatcher reuses its analysis
+    for j, b in enumerate(profiles):
+        for i in range(j):
+            ratio = cascade.score(profiles[i], b)
+            if ratio is not None:
+                found.append((i, j, ratio))
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pairs of documents above a SequenceMatcher ratio")
+    parser.add_argument("folder")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    paths, texts = [], []
+    for path, text in iter_documents(args.folder):
+        paths.append(os.path.basename(path))
+        texts.append(text)
+    scorer = ScoringCascade(args.threshold)
+    for i, j, score in sorted(similar_pairs(texts, cascade=scorer), key=lambda p: -p[2]):
+        print(f"{score*100:6.2f}%  {paths[i]}  {paths[j]}")
+    print(scorer.report())
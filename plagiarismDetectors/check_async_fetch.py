@@ -0,0 +1,165 @@
+"""
+Self-check for async_fetch.AsyncFetcher against a local stand-in HTTP server.
+
+Starts http.server in-process on 127.0.0.1 (no network needed) and checks:
+
+    keep-alive  - sequential requests to one host reuse a single connection
+    chunked     - Transfer-Encoding: chunked bodies are reassembled
+    redirect    - 301/302 chains are followed to the final URL
+    deadline    - a response slower than the timeout is dropped in time
+    queueing    - time spent waiting for a host slot doesn't use up the deadline,
+                  and a busy host doesn't hold up requests to another one
+
+    python check_async_fetch.py
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from async_fetch import AsyncFetcher
+
+# --- Settings ---
+HOST = "127.0.0.1"
+SLOW_SECONDS = 1.0      # response time of /slow pages in the queueing check
+
+
+# --- Stand-in server ---
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"       # keep-alive unless a response says otherwise
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with Handler.lock:
+            Handler.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, body, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        if parts.path.startswith("/page/"):
+            self.send_body(f"page {parts.path[6:]}".encode())
+        elif parts.path == "/chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for piece in (b"first ", b"second ", b"x" * 5000):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(piece), piece))
+            self.wfile.write(b"0\r\n\r\n")
+        elif parts.path == "/redirect":
+            hops = int(query.get("hops", ["1"])[0])
+            target = f"/redirect?hops={hops - 1}" if hops > 1 else "/page/final"
+            self.send_response(302)
+            self.send_header("Location", target)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif parts.path == "/slow":
+            time.sleep(float(query.get("s", ["1"])[0]))
+            self.send_body(b"slow page")
+        else:
+            self.send_body(b"not found", 404)
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass        # clients hanging up on /slow (the deadline check) are expected
+
+
+def start_server():
+    server = Server((HOST, 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- Checks ---
+async def check_keep_alive(base):
+    Handler.connections = 0
+    async with AsyncFetcher(per_host=1) as fetcher:
+        for n in range(10):
+            response = await fetcher.fetch(f"{base}/page/{n}")
+            assert response.body == f"page {n}".encode(), response.body
+    assert Handler.connections == 1, f"{Handler.connections} connections for 10 requests"
+
+
+async def check_chunked(base):
+    async with AsyncFetcher() as fetcher:
+        response = await fetcher.fetch(f"{base}/chunked")
+        assert response.body == b"first second " + b"x" * 5000, response.body[:40]
+        # The connection must still be usable after the terminating chunk
+        response = await fetcher.fetch(f"{base}/page/after")
+        assert response.body == b"page after"
+
+
+async def check_redirect(base):
+    async with AsyncFetcher() as fetcher:
+        response = await fetcher.fetch(f"{base}/redirect?hops=3")
+    assert response.status == 200 and response.url == f"{base}/page/final", response
+
+
+async def check_deadline(base):
+    async with AsyncFetcher(timeout=0.5) as fetcher:
+        start = time.monotonic()
+        responses = await fetcher.fetch_all([f"{base}/slow?s=2"])
+        elapsed = time.monotonic() - start
+    assert responses[f"{base}/slow?s=2"] is None, "slow page wasn't dropped"
+    assert elapsed < 1.5, f"deadline of 0.5s took {elapsed:.1f}s"
+
+
+async def check_queueing(base, other_base):
+    # 12 pages of SLOW_SECONDS on one host, 4 at a time: the last ones wait
+    # ~2 * SLOW_SECONDS for a slot but must still get their own 1.5 * SLOW_SECONDS
+    urls = [f"{base}/slow?s={SLOW_SECONDS}&n={n}" for n in range(12)]
+    async with AsyncFetcher(concurrency=6, per_host=4, timeout=1.5 * SLOW_SECONDS) as fetcher:
+        slow = asyncio.ensure_future(fetcher.fetch_all(urls))
+        await asyncio.sleep(0.1)
+        start = time.monotonic()
+        other = await fetcher.fetch(f"{other_base}/page/other")
+        other_time = time.monotonic() - start
+        responses = await slow
+    failed = sum(1 for r in responses.values() if r is None)
+    assert failed == 0, f"{failed} of 12 queued pages timed out"
+    assert other.body == b"page other"
+    assert other_time < SLOW_SECONDS / 2, f"other host waited {other_time:.1f}s"
+
+
+async def main():
+    server = start_server()
+    port = server.server_address[1]
+    base = f"http://{HOST}:{port}"
+    other_base = f"http://localhost:{port}"     # same server, another origin for the fetcher
+    checks = [("keep-alive", check_keep_alive(base)),
+              ("chunked", check_chunked(base)),
+              ("redirect", check_redirect(base)),
+              ("deadline", check_deadline(base)),
+              ("queueing", check_queueing(base, other_base))]
+    failures = 0
+    for name, check in checks:
+        try:
+            await check
+            print(f"ok    {name}")
+        except AssertionError as e:
+            failures += 1
+            print(f"FAIL  {name}: {e}")
+    server.shutdown()
+    return failures
+
+
+if __name__ == "__main__":
+    failed = asyncio.run(main())
+    if failed:
+        raise SystemExit(f"{failed} check(s) failed")
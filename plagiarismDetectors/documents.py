@@ -0,0 +1,28 @@
+"""
+Document reader shared by the plagiarism checkers.
+Reads text files the same way everywhere so every engine sees the same input.
+"""
+
+import os
+
+# Extensions treated as plain-text submissions when scanning a folder
+TEXT_EXTENSIONS = (".txt",)
+
+
+def read_document(path):
+    """Return the full text of a document (undecodable bytes are replaced)."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def list_documents(folder, extensions=TEXT_EXTENSIONS):
+    """Paths of all text documents directly inside folder, sorted by name."""
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if name.lower().endswith(extensions)
+            and os.path.isfile(os.path.join(folder, name))]
+
+
+def iter_documents(folder, extensions=TEXT_EXTENSIONS):
+    """Yield (path, text) for every text document directly inside folder."""
+    for path in list_documents(folder, extensions):
+        yield path, read_document(path)
@@ -0,0 +1,341 @@
+"""
+Persistent, memory-mapped fingerprint store for the plagiarism corpus.
+
+Each document is fingerprinted once; its winnowing fingerprints and MinHash
+signature are kept on disk in fixed-width 64-bit arrays, keyed by a hash of the
+document's content. Later runs only hash the text and read the arrays back
+through mmap, so nothing is re-fingerprinted and the data stays in the OS page
+cache instead of the Python heap.
+
+Files inside the store folder:
+    meta.json         engine settings the store was built with
+    keys.bin          open-addressing hash table: (key_lo, key_hi, slot + 1)
+    slots.bin         per document: (offset into fingerprints.bin, count)
+    signatures.bin    per document: NUM_PERM signature values
+    fingerprints.bin  all fingerprint hashes, one document after another
+    lock              held (exclusively) while a handle opens, repairs or writes
+
+Several handles, in one process or several, may use a store at once: writers
+take turns through the lock, and readers pick up what other handles added
+(remapping grown arrays and a rebuilt keys.bin) when they look it up.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from array import array
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+import minhash_lsh
+import winnowing
+
+_INITIAL_CAPACITY = 1024    # hash table entries, always a power of two
+
+
+def document_key(text):
+    """128-bit content hash identifying a document."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class _MappedArray:
+    """Append-only file of unsigned 64-bit ints, read through mmap."""
+
+    def __init__(self, path):
+        self.path = path
+        open(path, "ab").close()
+        self._file = open(path, "r+b")
+        self._map = None
+        self._view = None
+        self._remap()
+
+    def __len__(self):
+        return len(self._view) if self._view is not None else 0
+
+    def refresh(self):
+        """Remap if another handle appended to the file."""
+        if os.fstat(self._file.fileno()).st_size != len(self) * 8:
+            self._remap()
+
+    def _remap(self):
+        # Views handed out earlier keep the old mapping alive until they are
+        # dropped, so it is left to the garbage collector instead of closed.
+        self._map = None
+        self._view = None
+        if os.path.getsize(self.path):
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map).cast("Q")
+
+    def append(self, values):
+        """Append values; returns the index of the first one."""
+        # The real end of the file: another handle may have appended since
+        # this one was mapped
+        start = self._file.seek(0, os.SEEK_END) // 8
+        array("Q", values).tofile(self._file)
+        self._file.flush()
+        self._remap()
+        return start
+
+    def slice(self, start, count):
+        """Zero-copy view of count values starting at start."""
+        return self._view[start:start + count]
+
+    def close(self):
+        self._map = None
+        self._view = None
+        self._file.close()
+
+
+class FingerprintStore:
+    """On-disk fingerprint/signature store keyed by document content hash.
+
+        store = FingerprintStore("fingerprint_db")
+        fp = store.fingerprint_set(text)   # computed once, loaded afterwards
+    """
+
+    def __init__(self, folder, k=winnowing.K, window=winnowing.WINDOW,
+                 num_perm=minhash_lsh.NUM_PERM):
+        self.folder = folder
+        self.k = k
+        self.window = window
+        self.num_perm = num_perm
+        os.makedirs(folder, exist_ok=True)
+        self._lock_file = open(os.path.join(folder, "lock"), "a+b")
+        with self._locked():
+            self._check_meta()
+            self._repair()
+
+            self._slots = _MappedArray(os.path.join(folder, "slots.bin"))
+            self._signatures = _MappedArray(os.path.join(folder, "signatures.bin"))
+            self._fingerprints = _MappedArray(os.path.join(folder, "fingerprints.bin"))
+            self._keys_path = os.path.join(folder, "keys.bin")
+            self._keys_file = None
+            self._keys_map = None
+            self._keys = None
+            self._open_keys()
+
+    # --- Locking ---
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock on the store, shared with every other handle and process."""
+        fd = self._lock_file.fileno()
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            self._lock_file.seek(0)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def _keys_replaced(self):
+        """True if another handle rebuilt keys.bin (see _grow) since it was mapped."""
+        try:
+            return os.stat(self._keys_path).st_ino != os.fstat(self._keys_file.fileno()).st_ino
+        except FileNotFoundError:
+            return False    # mid-replace; the old table is still valid
+
+    def _refresh(self):
+        """Pick up documents other handles added."""
+        if self._keys_replaced():
+            self._close_keys()
+            self._open_keys()
+        self._slots.refresh()
+        self._signatures.refresh()
+        self._fingerprints.refresh()
+
+    # --- Setup ---
+    def _check_meta(self):
+        meta = {"k": self.k, "window": self.window, "num_perm": self.num_perm}
+        path = os.path.join(self.folder, "meta.json")
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                stored = json.load(f)
+            if stored != meta:
+                raise ValueError(f"store {self.folder} was built with {stored}, not {meta}")
+        else:
+            with open(path, "w") as f:
+                json.dump(meta, f)
+
+    def _repair(self):
+        """Cut off data left at the end of the arrays by an unfinished put().
+
+        put() appends fingerprints, then the signature, then the slot record.
+        Signatures are found by slot number, so a signature written without
+        its slot would shift every later document's signature by one.
+        """
+        def cut(name, size):
+            path = os.path.join(self.folder, name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+        slots_path = os.path.join(self.folder, "slots.bin")
+        records = os.path.getsize(slots_path) // 16 if os.path.exists(slots_path) else 0
+        cut("slots.bin", records * 16)      # a half-written record
+        cut("signatures.bin", records * self.num_perm * 8)
+        fingerprints_end = 0
+        if records:
+            last = array("Q")
+            with open(slots_path, "rb") as f:
+                f.seek((records - 1) * 16)
+                last.fromfile(f, 2)
+            fingerprints_end = last[0] + last[1]
+        cut("fingerprints.bin", fingerprints_end * 8)
+
+    def _open_keys(self, capacity=_INITIAL_CAPACITY):
+        if not os.path.exists(self._keys_path) or not os.path.getsize(self._keys_path):
+            with open(self._keys_path, "wb") as f:
+                f.truncate(capacity * 3 * 8)
+        self._keys_file = open(self._keys_path, "r+b")
+        self._keys_map = mmap.mmap(self._keys_file.fileno(), 0)
+        self._keys = memoryview(self._keys_map).cast("Q")
+
+    def _close_keys(self):
+        self._keys.release()
+        self._keys_map.close()
+        self._keys_file.close()
+
+    @property
+    def _capacity(self):
+        return len(self._keys) // 3
+
+    def __len__(self):
+        return len(self._slots) // 2
+
+    def __contains__(self, text):
+        return self._find(document_key(text)) is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Hash table ---
+    def _probe(self, key, keys=None):
+        """Table index holding key, or the empty index where it would go."""
+        if keys is None:
+            keys = self._keys
+        lo = int.from_bytes(key[:8], "little")
+        hi = int.from_bytes(key[8:], "little")
+        mask = len(keys) // 3 - 1
+        i = lo & mask
+        while keys[3 * i + 2] and (keys[3 * i] != lo or keys[3 * i + 1] != hi):
+            i = (i + 1) & mask
+        return i, lo, hi
+
+    def _find(self, key):
+        i, _, _ = self._probe(key)
+        slot = self._keys[3 * i + 2]
+        if not slot and self._keys_replaced():
+            # Another handle grew the table; key may be in the new one
+            self._refresh()
+            i, _, _ = self._probe(key)
+            slot = self._keys[3 * i + 2]
+        if slot and 2 * slot > len(self._slots):
+            # Added by another handle after our arrays were mapped; its data
+            # was written before its key, so remapping finds it
+            self._refresh()
+        return slot - 1 if slot else None
+
+    def _insert(self, key, slot, keys=None):
+        if keys is None:
+            keys = self._keys
+        i, lo, hi = self._probe(key, keys)
+        keys[3 * i] = lo
+        keys[3 * i + 1] = hi
+        keys[3 * i + 2] = slot + 1
+
+    def _grow(self):
+        """Double the hash table once it is half full."""
+        # Rebuild into a new file and swap it in, so the old table stays
+        # valid on disk until the new one is complete.
+        table = array("Q", bytes(self._capacity * 2 * 3 * 8))
+        old = self._keys
+        for i in range(self._capacity):
+            if old[3 * i + 2]:
+                key = old[3 * i].to_bytes(8, "little") + old[3 * i + 1].to_bytes(8, "little")
+                self._insert(key, old[3 * i + 2] - 1, table)
+        tmp_path = self._keys_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            table.tofile(f)
+        self._close_keys()
+        os.replace(tmp_path, self._keys_path)
+        self._open_keys()
+
+    # --- Reading / writing ---
+    def add(self, text):
+        """Fingerprint text and store it (no-op if already stored); returns its key."""
+        key = document_key(text)
+        if self._find(key) is None:
+            self.put(key, winnowing.fingerprint_set(text, self.k, self.window))
+        return key
+
+    def put(self, key, fingerprints):
+        """Store fingerprints computed elsewhere (e.g. in a worker process)."""
+        if self._find(key) is not None:
+            return
+        fingerprints = sorted(fingerprints)
+        signature = minhash_lsh.minhash_signature(fingerprints, self.num_perm)
+
+        with self._locked():
+            self._refresh()
+            if self._find(key) is not None:
+                return      # another handle stored it meanwhile
+
+            # Data first, hash table entry last, so a crash never leaves a key
+            # pointing at missing data; whatever a crash leaves past the last
+            # slot record is cut off by _repair() on the next open.
+            offset = self._fingerprints.append(fingerprints)   # end of file if empty
+            self._signatures.append(signature)
+            slot = self._slots.append([offset, len(fingerprints)]) // 2
+
+            if (slot + 1) * 2 > self._capacity:
+                self._grow()
+            self._insert(key, slot)
+            self._keys_map.flush()
+
+    def fingerprints(self, key):
+        """Sorted fingerprint hashes (zero-copy view) for key, or None."""
+        slot = self._find(key)
+        if slot is None:
+            return None
+        offset, count = self._slots.slice(2 * slot, 2)
+        if not count:
+            return memoryview(array("Q"))
+        return self._fingerprints.slice(offset, count)
+
+    def signature(self, key):
+        """MinHash signature (zero-copy view) for key, or None."""
+        slot = self._find(key)
+        if slot is None:
+            return None
+        return self._signatures.slice(slot * self.num_perm, self.num_perm)
+
+    def fingerprint_set(self, text):
+        """Fingerprint hash set for text, computed only if not stored yet."""
+        key = self.add(text)
+        return set(self.fingerprints(key))
+
+    def document_signature(self, text):
+        """MinHash signature tuple for text, computed only if not stored yet."""
+        key = self.add(text)
+        return tuple(self.signature(key))
+
+    def close(self):
+        self._close_keys()
+        self._slots.close()
+        self._signatures.close()
+        self._fingerprints.close()
+        self._lock_file.close()
@@ -0,0 +1,88 @@
+"""
+Run slow checks off the Tk main loop.
+
+Tkinter isn't thread-safe and a long callback freezes the window ("Not
+Responding"). BackgroundTask runs the work on a daemon thread; the thread only
+puts messages on a queue, and the Tk main loop polls that queue with after()
+and applies them to the widgets. Cancelling just sets an Event that the work
+function checks between steps.
+"""
+
+import queue
+import threading
+
+POLL_MS = 100   # how often the Tk main loop checks for messages
+
+
+class Cancelled(Exception):
+    """Raised inside the work function when the user pressed Cancel."""
+
+
+class BackgroundTask:
+    """Runs work(task) on a thread and marshals its messages back to Tk.
+
+    Inside work, call:
+        task.progress(done, total, text)  - move the progress bar
+        task.partial(result)              - show intermediate results
+        task.check_cancelled()            - raises Cancelled after cancel()
+    work's return value is passed to on_done on the Tk thread.
+    """
+
+    def __init__(self, root, work, on_progress=None, on_partial=None,
+                 on_done=None, on_error=None, on_cancelled=None):
+        self.root = root
+        self._work = work
+        self._handlers = {"progress": on_progress, "partial": on_partial, "done": on_done,
+                          "error": on_error, "cancelled": on_cancelled}
+        self._messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    # --- Worker thread side ---
+    def _run(self):
+        try:
+            result = self._work(self)
+        except Cancelled:
+            self._messages.put(("cancelled", None))
+        except Exception as e:
+            self._messages.put(("error", e))
+        else:
+            self._messages.put(("done", result))
+
+    def progress(self, done, total, text=""):
+        self._messages.put(("progress", (done, total, text)))
+
+    def partial(self, result):
+        self._messages.put(("partial", result))
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise Cancelled()
+
+    # --- Tk thread side ---
+    def start(self):
+        self._thread.start()
+        self.root.after(POLL_MS, self._poll)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _poll(self):
+        finished = False
+        while True:
+            try:
+                kind, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            handler = self._handlers[kind]
+            if handler is None:
+                pass
+            elif kind == "progress":
+                handler(*payload)
+            elif kind == "cancelled":
+                handler()
+            else:
+                handler(payload)
+            finished = finished or kind in ("done", "error", "cancelled")
+        if not finished:
+            self.root.after(POLL_MS, self._poll)
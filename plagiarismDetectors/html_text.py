@@ -0,0 +1,124 @@
+"""
+Streaming HTML -> plain text for fetched pages.
+
+BeautifulSoup(html, 'html.parser').get_text() builds a whole DOM for every
+page and keeps the boilerplate: script and style code, menus, footers,
+sidebars, buttons... all of which then gets scored against the sentences.
+Here the page goes through html.parser.HTMLParser chunk by chunk instead:
+
+ - no tree is built, text comes out as soon as a chunk is parsed
+ - everything inside SKIP_TAGS is dropped
+ - block tags become line breaks, so words of different blocks don't run
+   together
+ - extraction stops after MAX_TEXT characters of text, and callers reading
+   from the network stop after MAX_PAGE_BYTES of HTML
+"""
+
+import re
+from html.parser import HTMLParser
+
+# --- Settings ---
+MAX_PAGE_BYTES = 2 * 1024 * 1024    # HTML read per page
+MAX_TEXT = 500_000                  # characters of text kept per page
+CHUNK = 64 * 1024
+
+# Not <form> (ASP.NET pages wrap the whole body in one) and not <header>
+# (<article><header> holds the title and often the first paragraph)
+SKIP_TAGS = frozenset("""
+script style noscript template head nav footer aside button
+select option textarea iframe svg canvas menu dialog
+""".split())
+
+BLOCK_TAGS = frozenset("""
+address article blockquote br dd div dl dt fieldset figcaption figure form h1
+h2 h3 h4 h5 h6 header hr li main ol p pre section table tbody td th thead tr ul
+""".split())
+
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\s*\n\s*")
+
+
+class TextExtractor(HTMLParser):
+    """Incremental HTML to text converter.
+
+        extractor = TextExtractor()
+        for chunk in chunks:
+            extractor.feed(chunk)
+            text_so_far = extractor.take()
+    """
+
+    def __init__(self, max_text=MAX_TEXT):
+        super().__init__(convert_charrefs=True)
+        self.max_text = max_text
+        self.length = 0         # characters of text produced so far
+        self._skipping = []     # open SKIP_TAGS elements
+        self._pieces = []
+        self._pending = ""      # trailing whitespace held back by take()
+
+    @property
+    def full(self):
+        """True once max_text characters were produced; feeding more is pointless."""
+        return self.max_text is not None and self.length >= self.max_text
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self._skipping.clear()      # </head> is optional in HTML
+        elif tag in SKIP_TAGS:
+            self._skipping.append(tag)
+        elif tag in BLOCK_TAGS and not self._skipping:
+            self._pieces.append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS and not self._skipping:
+            self._pieces.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self._skipping:
+            # Also closes skipped elements that were never closed themselves
+            while self._skipping.pop() != tag:
+                pass
+        elif tag in BLOCK_TAGS and not self._skipping:
+            self._pieces.append("\n")
+
+    def handle_data(self, data):
+        if self._skipping or self.full:
+            return
+        if self.max_text is not None:
+            data = data[:self.max_text - self.length]
+        self.length += len(data)
+        self._pieces.append(data)
+
+    def take(self):
+        """Text produced since the last call, whitespace tidied.
+
+        Trailing whitespace is kept back until more text follows, so the
+        result doesn't depend on where the chunks were cut.
+        """
+        text = self._pending + "".join(self._pieces)
+        self._pieces = []
+        text = _BLANK_LINES.sub("\n", _SPACES.sub(" ", text))
+        kept = text.rstrip()
+        self._pending = text[len(kept):]
+        return kept
+
+
+def iter_text(chunks, max_text=MAX_TEXT):
+    """Yield text pieces while HTML chunks (str) are parsed; stops early when full."""
+    extractor = TextExtractor(max_text)
+    for chunk in chunks:
+        extractor.feed(chunk)
+        text = extractor.take()
+        if text:
+            yield text
+        if extractor.full:
+            return
+    extractor.close()
+    text = extractor.take()
+    if text:
+        yield text
+
+
+def html_to_text(html, max_text=MAX_TEXT):
+    """Plain text of a whole HTML page (a drop-in for BeautifulSoup(...).get_text())."""
+    chunks = (html[i:i + CHUNK] for i in range(0, len(html), CHUNK))
+    return "".join(iter_text(chunks, max_text)).strip()
@@ -0,0 +1,126 @@
+"""
+Incremental re-checking of resubmitted drafts, one paragraph at a time.
+
+A resubmission usually changes a few paragraphs, yet the whole document used
+to be compared again. Here the submission is split into paragraphs and each
+one is identified by a hash of its normalized text:
+
+ - paragraph fingerprints live in the FingerprintStore, so only new or edited
+   paragraphs are ever fingerprinted
+ - each (paragraph, reference document) score is saved in a small SQLite file,
+   so unchanged paragraphs aren't even re-scored
+ - the overall similarity uses the union of the paragraphs' stored
+   fingerprints, so a paragraph repeated several times counts once; the
+   cached per-paragraph rows only feed the per-paragraph report
+"""
+
+import os
+import re
+import sqlite3
+from collections import namedtuple
+
+from fingerprint_store import document_key
+from normalization import Normalizer
+from winnowing import Similarity
+
+SCORES_FILE = "paragraph_scores.sqlite3"
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+ParagraphScore = namedtuple("ParagraphScore", ["start", "end", "shared", "total", "cached"])
+ParagraphScore.__doc__ = """Result for one paragraph of the submission.
+start/end - character span of the paragraph in the submitted text
+shared    - fingerprints also found in the reference document
+total     - fingerprints in the paragraph
+cached    - True if the score was reused from an earlier check
+"""
+
+CheckResult = namedtuple("CheckResult", ["similarity", "paragraphs", "rescored"])
+
+
+def split_paragraphs(text):
+    """(start, end) spans of the non-blank paragraphs in text."""
+    spans = []
+    start = 0
+    for match in _PARAGRAPH_BREAK.finditer(text):
+        if text[start:match.start()].strip():
+            spans.append((start, match.start()))
+        start = match.end()
+    if text[start:].strip():
+        spans.append((start, len(text)))
+    return spans
+
+
+class IncrementalChecker:
+    """Scores a submission against a reference, reusing per-paragraph results.
+
+        with FingerprintStore("fingerprint_db") as store:
+            checker = IncrementalChecker(store)
+            result = checker.check(submission_text, reference_text)
+    """
+
+    def __init__(self, store, normalizer=None, scores_file=SCORES_FILE):
+        self.store = store
+        self.normalizer = normalizer or Normalizer()
+        folder = os.path.dirname(scores_file)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._db = sqlite3.connect(scores_file)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS scores (
+                                paragraph BLOB NOT NULL,
+                                reference BLOB NOT NULL,
+                                shared INTEGER NOT NULL,
+                                total INTEGER NOT NULL,
+                                PRIMARY KEY (paragraph, reference))""")
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def check(self, submission, reference):
+        """Compare raw submission text with (already normalized) reference text."""
+        reference_key = self.store.add(reference)
+        reference_fp = set(self.store.fingerprints(reference_key))
+
+        paragraphs = []
+        submission_fp = set()   # union of all paragraphs' fingerprints
+        rescored = 0
+        for start, end in split_paragraphs(submission):
+            normalized = self.normalizer.normalize(submission[start:end])
+            key = document_key(normalized)
+            row = self._db.execute("SELECT shared, total FROM scores "
+                                   "WHERE paragraph = ? AND reference = ?",
+                                   (key, reference_key)).fetchone()
+            if row:
+                # Stored when the row was written; fingerprinted again only if
+                # the store was replaced since
+                stored = self.store.fingerprints(key)
+                submission_fp.update(stored if stored is not None
+                                     else self.store.fingerprint_set(normalized))
+                paragraphs.append(ParagraphScore(start, end, row[0], row[1], True))
+                continue
+
+            fp = self.store.fingerprint_set(normalized)
+            submission_fp |= fp
+            shared = len(fp & reference_fp)
+            self._db.execute("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)",
+                             (key, reference_key, shared, len(fp)))
+            paragraphs.append(ParagraphScore(start, end, shared, len(fp), False))
+            rescored += 1
+        self._db.commit()
+
+        # Overall score from the union of the paragraphs' fingerprints: summing
+        # the per-paragraph counts would count repeated paragraphs again
+        shared = len(submission_fp & reference_fp)
+        total = len(submission_fp)
+        union = total + len(reference_fp) - shared
+        similarity = Similarity(shared / union if union else 0.0,
+                                shared / total if total else 0.0,
+                                shared)
+        return CheckResult(similarity, paragraphs, rescored)
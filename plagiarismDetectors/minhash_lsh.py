@@ -0,0 +1,182 @@
+"""
+MinHash signatures + banded LSH index for corpus-wide plagiarism search.
+
+Instead of comparing a new submission against every document in the corpus
+(N comparisons, N^2 for a whole class), each document gets a short MinHash
+signature of its winnowing fingerprints. The signature is cut into bands and
+every band is dropped into a hash bucket; documents sharing any bucket with the
+submission become "candidates", and only those are sent to the exact scorer.
+
+Usage:
+    python minhash_lsh.py <corpus_folder> <submission.txt> [store_folder]
+
+With a store folder (see fingerprint_store.py) the corpus is fingerprinted
+once and later runs load signatures and fingerprints from disk.
+"""
+
+import os
+import random
+import sys
+from collections import defaultdict
+
+from documents import iter_documents, read_document
+from winnowing import fingerprint_set, score_fingerprints
+
+# --- Settings ---
+NUM_PERM = 64       # signature length (number of hash functions)
+BANDS = 32          # NUM_PERM must be divisible by BANDS
+# With 32 bands of 2 rows, pairs with Jaccard ~0.18+ very likely become candidates
+SEED = 1            # fixed so signatures stay comparable between runs
+
+_PRIME = (1 << 61) - 1
+_EMPTY = _PRIME     # marks a signature slot no shingle landed in
+
+# Hash mixer h(x) = (a*x + b) mod prime, fixed by SEED
+_rng = random.Random(SEED)
+_A = _rng.randrange(1, _PRIME)
+_B = _rng.randrange(0, _PRIME)
+
+
+# --- Signatures ---
+def minhash_signature(shingles, num_perm=NUM_PERM):
+    """MinHash signature (tuple of ints) of a set of integer shingle hashes.
+
+    Uses one-permutation hashing (Li, Owen & Zhang, 2012): each shingle is
+    hashed once and lands in one of num_perm bins, and each bin keeps its
+    minimum. That is one hash per shingle instead of num_perm of them. Empty
+    bins borrow from the next filled bin to the right ("rotation
+    densification", Shrivastava & Li, 2014) so that signatures of small
+    documents still line up slot for slot.
+    """
+    mins = [_EMPTY] * num_perm
+    for x in shingles:
+        h = (_A * x + _B) % _PRIME
+        slot = h % num_perm
+        value = h // num_perm
+        if value < mins[slot]:
+            mins[slot] = value
+    if all(value == _EMPTY for value in mins):
+        return tuple(mins)
+
+    # Borrowed values are shifted past every real value (< _PRIME // num_perm)
+    # so they never collide with one; the result still fits in 64 bits.
+    step = _PRIME // num_perm + 1
+    signature = list(mins)
+    for slot in range(num_perm):
+        if mins[slot] != _EMPTY:
+            continue
+        distance = 1
+        while mins[(slot + distance) % num_perm] == _EMPTY:
+            distance += 1
+        signature[slot] = mins[(slot + distance) % num_perm] + distance * step
+    return tuple(signature)
+
+
+def document_signature(text, num_perm=NUM_PERM):
+    """MinHash signature of a document's winnowing fingerprints."""
+    return minhash_signature(fingerprint_set(text), num_perm)
+
+
+def estimate_jaccard(sig1, sig2):
+    """Fraction of equal signature slots ~ Jaccard similarity of the sets."""
+    if not sig1:
+        return 0.0
+    return sum(1 for x, y in zip(sig1, sig2) if x == y) / len(sig1)
+
+
+# --- LSH index ---
+class LSHIndex:
+    """Banded LSH index: maps each band of a signature to a bucket of doc ids."""
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets = [defaultdict(list) for _ in range(bands)]
+        self.signatures = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _band_keys(self, signature):
+        r = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * r:(band + 1) * r]
+
+    def add(self, doc_id, signature):
+        """Insert a document signature under doc_id."""
+        if len(signature) != self.num_perm:
+            raise ValueError(f"expected a signature of length {self.num_perm}")
+        self.signatures[doc_id] = signature
+        for band, key in self._band_keys(signature):
+            self.buckets[band][key].append(doc_id)
+
+    def query(self, signature):
+        """Return the set of doc ids sharing at least one band with signature."""
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            bucket = self.buckets[band].get(key)
+            if bucket:
+                candidates.update(bucket)
+        return candidates
+
+
+# --- Corpus search ---
+def build_corpus_index(folder, store=None):
+    """Signature every document in folder -> LSHIndex keyed by file path.
+
+    store is an optional FingerprintStore that caches signatures on disk.
+    """
+    index = LSHIndex()
+    for path, text in iter_documents(folder):
+        if store is not None:
+            index.add(path, store.document_signature(text))
+        else:
+            index.add(path, document_signature(text))
+    return index
+
+
+def find_similar(index, text, min_score=0.1, exclude=None, store=None):
+    """Match a submission against the corpus.
+
+    Only LSH candidates are re-read and scored with the exact winnowing
+    scorer. Returns [(path, Similarity)] sorted by containment, best first.
+    """
+    fingerprints_of = store.fingerprint_set if store is not None else fingerprint_set
+    fp = fingerprints_of(text)
+    signature = minhash_signature(fp, index.num_perm)
+    results = []
+    for path in index.query(signature):
+        if exclude and os.path.abspath(path) == os.path.abspath(exclude):
+            continue
+        similarity = score_fingerprints(fp, fingerprints_of(read_document(path)))
+        if similarity.containment >= min_score or similarity.jaccard >= min_score:
+            results.append((path, similarity))
+    results.sort(key=lambda item: item[1].containment, reverse=True)
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print(__doc__)
+        sys.exit(1)
+
+    corpus_folder, submission_path = sys.argv[1], sys.argv[2]
+    fingerprint_store = None
+    if len(sys.argv) == 4:
+        from fingerprint_store import FingerprintStore
+        fingerprint_store = FingerprintStore(sys.argv[3])
+
+    print(f"Indexing corpus: {corpus_folder}")
+    corpus_index = build_corpus_index(corpus_folder, fingerprint_store)
+    print(f"Indexed {len(corpus_index)} documents\n")
+
+    matches = find_similar(corpus_index, read_document(submission_path),
+                           exclude=submission_path, store=fingerprint_store)
+    if not matches:
+        print("No similar documents found.")
+    for match_path, sim in matches:
+        print(f"{sim.containment*100:6.2f}% contained  "
+              f"{sim.jaccard*100:6.2f}% overlap  {match_path}")
@@ -0,0 +1,130 @@
+"""
+Text normalization pipeline for the document checkers, cached on disk.
+
+Comparing raw f.read() output means "Résumé", "resume" and "RESUME," all look
+different, and whitespace/punctuation noise adds work to every comparison. The
+pipeline below streams a file through:
+
+    Unicode folding (NFKD, accents dropped) -> casefold -> punctuation to
+    spaces -> whitespace collapsed -> optional stopword removal -> optional
+    stemming
+
+and stores the result under <cache>/<sha256 of file>-<normalizer key>.txt. The
+key includes NORMALIZER_VERSION and the options, so changing either one never
+serves stale output. Re-checking an unchanged file only costs one hash pass.
+"""
+
+import hashlib
+import os
+import unicodedata
+
+# --- Settings ---
+NORMALIZER_VERSION = 1      # bump whenever the output of the pipeline changes
+CACHE_FOLDER = "normalized_cache"
+CHUNK_SIZE = 64 * 1024      # characters read per step
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no nor
+not now of off on once only or other our ours ourselves out over own same she
+should so some such than that the their theirs them themselves then there these
+they this those through to too under until up very was we were what when where
+which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+# Longest suffixes first; (suffix, replacement)
+_SUFFIXES = (
+    ("ational", "ate"), ("ization", "ize"), ("fulness", "ful"), ("iveness", "ive"),
+    ("ousness", "ous"), ("ements", ""), ("ement", ""), ("ments", ""), ("ment", ""),
+    ("ness", ""), ("ings", ""), ("ing", ""), ("ies", "y"), ("ied", "y"), ("edly", ""),
+    ("ed", ""), ("ly", ""), ("es", ""), ("s", ""),
+)
+
+
+def stem(word):
+    """Light suffix-stripping stemmer (keeps at least 3 letters of the stem)."""
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith("ss"):
+                return word
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+class Normalizer:
+    """Configurable normalization pipeline.
+
+        normalizer = Normalizer(stopwords=True)
+        text = normalizer.normalize_file("essay.txt")   # cached after the first call
+    """
+
+    def __init__(self, stopwords=False, stemming=False):
+        self.stopwords = stopwords
+        self.stemming = stemming
+
+    @property
+    def key(self):
+        """Identifies the pipeline's output format in cache file names."""
+        return f"v{NORMALIZER_VERSION}-sw{int(self.stopwords)}-st{int(self.stemming)}"
+
+    # --- Pipeline ---
+    def _fold(self, text):
+        """Unicode folding, casefold, and punctuation -> spaces."""
+        text = unicodedata.normalize("NFKD", text).casefold()
+        return "".join(ch if ch.isalnum() else " " for ch in text
+                       if not unicodedata.combining(ch))
+
+    def _filter(self, words):
+        if self.stopwords:
+            words = [w for w in words if w not in STOPWORDS]
+        if self.stemming:
+            words = [stem(w) for w in words]
+        return words
+
+    def normalize_stream(self, chunks):
+        """Normalize an iterable of text chunks, yielding normalized pieces.
+
+        A word cut in half at a chunk boundary is carried over to the next
+        chunk, so the output is the same as normalizing the whole text at once.
+        """
+        carry = ""
+        first = True
+        for chunk in chunks:
+            text = carry + self._fold(chunk)
+            words = text.split()
+            carry = words.pop() if words and not text[-1].isspace() else ""
+            words = self._filter(words)
+            if words:
+                yield ("" if first else " ") + " ".join(words)
+                first = False
+        words = self._filter([carry] if carry else [])
+        if words:
+            yield ("" if first else " ") + words[0]
+
+    def normalize(self, text):
+        """Normalize a whole string."""
+        return "".join(self.normalize_stream([text]))
+
+    # --- Cached file normalization ---
+    def normalize_file(self, path, cache_folder=CACHE_FOLDER):
+        """Normalized text of a file; normalized once per content + pipeline."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        cached = os.path.join(cache_folder, f"{digest.hexdigest()}-{self.key}.txt")
+        if os.path.exists(cached):
+            with open(cached, "r", encoding="utf-8") as f:
+                return f.read()
+
+        os.makedirs(cache_folder, exist_ok=True)
+        tmp_path = f"{cached}.{os.getpid()}.tmp"
+        with open(path, "r", encoding="utf-8", errors="replace") as src, \
+                open(tmp_path, "w", encoding="utf-8") as out:
+            for piece in self.normalize_stream(iter(lambda: src.read(CHUNK_SIZE), "")):
+                out.write(piece)
+        os.replace(tmp_path, cached)
+        with open(cached, "r", encoding="utf-8") as f:
+            return f.read()
@@ -0,0 +1,64 @@
+"""
+The online check of a whole text, shared by the GUI and the local service.
+
+Splits the text into sentences (nltk), then searches, fetches and scores them
+with query_planner.check_sentences_online().
+
+Needs googlesearch and nltk (with the punkt tokenizer):
+    pip install googlesearch-python nltk
+    python -c "import nltk; nltk.download('punkt')"
+"""
+
+from googlesearch import search
+from nltk.tokenize import sent_tokenize
+
+from html_text import MAX_PAGE_BYTES, html_to_text
+from query_planner import check_sentences_online
+
+# --- Settings ---
+MIN_SENTENCE = 20               # skip very short sentences
+PAGE_CACHE_FOLDER = "page_cache"
+FETCH_TIMEOUT = 3
+
+
+def search_urls(query):
+    # Pacing is done by the planner's rate limiter, not by googlesearch's pause
+    return list(search(query, num=2, stop=2, pause=0))
+
+
+def extract_text(html):
+    # Streaming parser, boilerplate (scripts, menus, footers...) left out
+    return html_to_text(html)
+
+
+def split_sentences(text, min_length=MIN_SENTENCE):
+    """Sentences of text worth searching for."""
+    sentences = [s.strip() for s in sent_tokenize(text)]
+    return [s for s in sentences if len(s) >= min_length]
+
+
+def check_text_online(text, cache=None, progress=None, should_stop=None):
+    """(sentences, [Match] per sentence, PlanStats) for a whole text.
+
+    progress(done, total, sentences, matches) is called as searches and pages
+    finish; should_stop() is polled to abandon the check early.
+    """
+    sentences = split_sentences(text)
+
+    def report(done, total, matches):
+        if progress:
+            progress(done, total, sentences, matches)
+
+    # Search, fetch and score in one pipeline:
+    #  - adjacent sentences share one search query, and queries whose sentences
+    #    were already found on a fetched page are skipped
+    #  - searches are rate limited without blocking, pages download concurrently
+    #  - every page is read once and matched against all sentences
+    #    -> best score and matching URL per sentence
+    # With a PageCache, fetched pages are kept as plain text (re-checked after
+    # a week), so cached pages need no download and no parsing.
+    matches, stats = check_sentences_online(sentences, search_urls, extract_text,
+                                            cache=cache, timeout=FETCH_TIMEOUT,
+                                            max_body=MAX_PAGE_BYTES,
+                                            progress=report, should_stop=should_stop)
+    return sentences, matches, stats
@@ -0,0 +1,207 @@
+"""
+On-disk cache of fetched, already text-extracted web pages.
+
+Popular pages (Wikipedia, essay mills) come up for many sentences and on every
+run. With this cache a repeat check costs no network I/O and no HTML parsing:
+
+ - page text is stored content-addressed (blobs/<sha256>.txt), so mirrors
+   with identical text share one file
+ - an SQLite index maps each URL to its blob, fetch time and validators
+   (ETag / Last-Modified)
+ - entries younger than the TTL are served straight from disk; older ones are
+   revalidated with a conditional GET, and a 304 reply just renews them
+ - when the cache grows past max_bytes, the least recently used pages go
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+
+from async_fetch import AsyncFetcher, FetchError, decode_body
+
+# --- Settings ---
+TTL = 7 * 24 * 3600                 # seconds before a page must be revalidated
+MAX_BYTES = 200 * 1024 * 1024       # total size of stored page text
+
+
+class PageCache:
+    """URL -> extracted page text, with TTL, LRU size limit and revalidation."""
+
+    def __init__(self, folder, ttl=TTL, max_bytes=MAX_BYTES):
+        self.folder = folder
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._blobs = os.path.join(folder, "blobs")
+        os.makedirs(self._blobs, exist_ok=True)
+        # The local service hands one cache from job thread to job thread; it is
+        # still only used by one thread at a time
+        self._db = sqlite3.connect(os.path.join(folder, "index.sqlite3"),
+                                   check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS pages (
+                                url TEXT PRIMARY KEY,
+                                blob TEXT NOT NULL,
+                                size INTEGER NOT NULL,
+                                fetched_at REAL NOT NULL,
+                                used_at REAL NOT NULL,
+                                etag TEXT,
+                                last_modified TEXT)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_used ON pages (used_at)")
+        self._db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def _blob_path(self, blob):
+        return os.path.join(self._blobs, blob + ".txt")
+
+    # --- Lookups ---
+    def lookup(self, url):
+        """(text, is_fresh, validator_headers) for a cached URL, or None."""
+        row = self._db.execute("SELECT blob, fetched_at, etag, last_modified FROM pages "
+                               "WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        blob, fetched_at, etag, last_modified = row
+        try:
+            with open(self._blob_path(blob), "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            self._delete(url)
+            return None
+        self._db.execute("UPDATE pages SET used_at = ? WHERE url = ?", (time.time(), url))
+        self._db.commit()
+
+        validators = {}
+        if etag:
+            validators["If-None-Match"] = etag
+        if last_modified:
+            validators["If-Modified-Since"] = last_modified
+        return text, time.time() - fetched_at < self.ttl, validators
+
+    def get(self, url):
+        """Cached text if it is still fresh, else None."""
+        entry = self.lookup(url)
+        return entry[0] if entry and entry[1] else None
+
+    # --- Updates ---
+    def put(self, url, text, etag=None, last_modified=None):
+        """Store the extracted text of a freshly fetched page."""
+        data = text.encode("utf-8")
+        blob = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(blob)
+        if not os.path.exists(path):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        old = self._db.execute("SELECT blob FROM pages WHERE url = ?", (url,)).fetchone()
+        now = time.time()
+        self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (url, blob, len(data), now, now, etag, last_modified))
+        self._db.commit()
+        if old and old[0] != blob:
+            self._drop_blob_if_unused(old[0])
+        self.evict()
+
+    def revalidated(self, url):
+        """The server answered 304 Not Modified: the cached copy is fresh again."""
+        now = time.time()
+        self._db.execute("UPDATE pages SET fetched_at = ?, used_at = ? WHERE url = ?",
+                         (now, now, url))
+        self._db.commit()
+
+    def _delete(self, url):
+        row = self._db.execute("SELECT blob FROM pages WHERE url = ?", (url,)).fetchone()
+        self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+        self._db.commit()
+        if row:
+            self._drop_blob_if_unused(row[0])
+
+    def _drop_blob_if_unused(self, blob):
+        if not self._db.execute("SELECT 1 FROM pages WHERE blob = ? LIMIT 1", (blob,)).fetchone():
+            try:
+                os.remove(self._blob_path(blob))
+            except FileNotFoundError:
+                pass
+
+    def total_bytes(self):
+        """Size of all stored page text (shared blobs counted once)."""
+        row = self._db.execute("SELECT SUM(size) FROM (SELECT DISTINCT blob, size FROM pages)").fetchone()
+        return row[0] or 0
+
+    def evict(self):
+        """Drop least recently used pages until the cache fits in max_bytes."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        # URLs still pointing at each blob: a blob's size only comes off the
+        # total when the last of them goes
+        users = dict(self._db.execute("SELECT blob, COUNT(*) FROM pages GROUP BY blob"))
+        urls = []
+        unused = []
+        for url, blob, size in self._db.execute("SELECT url, blob, size FROM pages "
+                                                "ORDER BY used_at").fetchall():
+            urls.append((url,))
+            users[blob] -= 1
+            if not users[blob]:
+                unused.append(blob)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        self._db.executemany("DELETE FROM pages WHERE url = ?", urls)
+        self._db.commit()
+        for blob in unused:
+            try:
+                os.remove(self._blob_path(blob))
+            except FileNotFoundError:
+                pass
+
+
+# --- Fetching through the cache ---
+async def fetch_text(fetcher, cache, url, extract):
+    """Extracted text of one page via the cache (None if unavailable)."""
+    entry = cache.lookup(url) if cache is not None else None
+    if entry and entry[1]:
+        return entry[0]                                 # fresh hit: no network at all
+
+    headers = entry[2] if entry else None
+    try:
+        response = await fetcher.fetch(url, headers)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, FetchError, ValueError):
+        return entry[0] if entry else None              # offline: serve the stale copy
+    if response.status == 304 and entry:
+        cache.revalidated(url)
+        return entry[0]
+    if response.status != 200:
+        return None
+
+    text = extract(decode_body(response))
+    if cache is not None:
+        cache.put(url, text, response.headers.get("etag"), response.headers.get("last-modified"))
+    return text
+
+
+def fetch_page_texts(urls, extract, cache=None, **fetcher_options):
+    """Blocking helper: {url: extracted text} for all URLs, using the cache.
+
+    extract turns a page's HTML into plain text; it only runs for pages that
+    actually had to be downloaded.
+    """
+    urls = list(dict.fromkeys(urls))
+
+    async def run():
+        async with AsyncFetcher(**fetcher_options) as fetcher:
+            return await asyncio.gather(*(fetch_text(fetcher, cache, url, extract)
+                                          for url in urls))
+
+    texts = asyncio.run(run())
+    return {url: text for url, text in zip(urls, texts) if text is not None}
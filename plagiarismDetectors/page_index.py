@@ -0,0 +1,102 @@
+"""
+Score all of a document's sentences against fetched web pages in one pass.
+
+The online checker used to run SequenceMatcher(None, sentence, webpage_text)
+for every (sentence, page) pair - roughly O(sentence x page) work each, over
+and over for the same pages. Instead:
+
+ - every sentence is cut into word shingles (SHINGLE consecutive words) and all
+   of them go into one small hash index: shingle -> sentences containing it
+ - each page is then read once, front to back; every page shingle is looked up
+   in that index, which credits all sentences sharing it at the same time
+
+A sentence's score against a page is the fraction of its shingles found on
+that page; the best page and score are kept per sentence.
+"""
+
+import re
+from collections import defaultdict, namedtuple
+
+# --- Settings ---
+SHINGLE = 3     # words per shingle
+
+_WORD = re.compile(r"\w+")
+
+Match = namedtuple("Match", ["score", "url"])
+Match.__doc__ = """Best page found for one sentence: score 0.0-1.0 and its URL (or None)."""
+
+
+def words(text):
+    """Lowercase words of text."""
+    return [w.lower() for w in _WORD.findall(text)]
+
+
+def shingles(word_list, size=SHINGLE):
+    """Set of hashed word shingles; a shorter text is one shingle by itself."""
+    if not word_list:
+        return set()
+    if len(word_list) < size:
+        return {hash(tuple(word_list))}
+    return {hash(tuple(word_list[i:i + size])) for i in range(len(word_list) - size + 1)}
+
+
+class ShingleMatcher:
+    """Matches a fixed list of sentences against any number of pages.
+
+        matcher = ShingleMatcher(sentences)
+        for url, text in pages.items():
+            matcher.scan_page(url, text)
+        matcher.results()   # [Match(score, url)] in sentence order
+    """
+
+    def __init__(self, sentences, size=SHINGLE):
+        self.size = size
+        self.sentences = list(sentences)
+        self._counts = []                   # shingles per sentence
+        self._index = defaultdict(list)     # shingle -> [sentence numbers]
+        self._lengths = {size}              # shingle lengths to look for on pages
+        for number, sentence in enumerate(self.sentences):
+            sentence_words = words(sentence)
+            if 0 < len(sentence_words) < size:
+                self._lengths.add(len(sentence_words))
+            sentence_shingles = shingles(sentence_words, size)
+            self._counts.append(len(sentence_shingles))
+            for shingle in sentence_shingles:
+                self._index[shingle].append(number)
+        self._best = [Match(0.0, None) for _ in self.sentences]
+
+    def scan_page(self, url, text, page_words=None):
+        """Read one page once and update every sentence's best match.
+
+        page_words can be passed when words(text) was already computed.
+        """
+        if page_words is None:
+            page_words = words(text)
+        hits = defaultdict(int)
+        seen = set()
+        index = self._index
+        for size in self._lengths:
+            for i in range(len(page_words) - size + 1):
+                shingle = hash(tuple(page_words[i:i + size]))
+                if shingle in seen or shingle not in index:
+                    continue
+                seen.add(shingle)
+                for number in index[shingle]:
+                    hits[number] += 1
+
+        for number, count in hits.items():
+            score = count / self._counts[number]
+            if score > self._best[number].score:
+                self._best[number] = Match(score, url)
+
+    def results(self):
+        """Best Match per sentence, in the order the sentences were given."""
+        return list(self._best)
+
+
+def score_sentences(sentences, page_texts, size=SHINGLE):
+    """[Match(score, url)] per sentence against all pages ({url: text})."""
+    matcher = ShingleMatcher(sentences, size)
+    for url, text in page_texts.items():
+        matcher.scan_page(url, text)
+    return matcher.results()
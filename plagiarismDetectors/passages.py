@@ -0,0 +1,171 @@
+"""
+Matched-passage extraction with a suffix array + LCP array.
+
+A single similarity percent doesn't tell a reviewer *what* was copied. This
+module finds every passage the two documents share (at least MIN_WORDS words
+long) and returns exact character spans in both original texts, ready to be
+highlighted in the Tkinter frontend.
+
+How it works:
+ - split both texts into lowercase words and join them: doc1 + # + doc2 + $
+ - build the suffix array (prefix doubling) and the LCP array (Kasai et al.)
+ - suffixes from different documents that sit close together in the suffix
+   array share a long common prefix -> that prefix is a copied passage
+"""
+
+import re
+from collections import namedtuple
+
+# --- Settings ---
+MIN_WORDS = 8   # shortest shared run of words reported as a passage
+
+_WORD = re.compile(r"\w+")
+
+Passage = namedtuple("Passage", ["start1", "end1", "start2", "end2", "words"])
+Passage.__doc__ = """A passage shared by both documents.
+start1/end1 - character span in the first text  (text1[start1:end1])
+start2/end2 - character span in the second text (text2[start2:end2])
+words       - length of the passage in words
+"""
+
+
+# --- Tokenizing ---
+def tokenize(text):
+    """Lowercase words of text plus the (start, end) character span of each."""
+    words = []
+    spans = []
+    for match in _WORD.finditer(text):
+        words.append(match.group().lower())
+        spans.append(match.span())
+    return words, spans
+
+
+# --- Suffix array / LCP ---
+def suffix_array(seq):
+    """Suffix array of a list of ints by prefix doubling (Manber & Myers).
+
+    Each round sorts by (rank of first half, rank of second half), doubling the
+    compared prefix length until every rank is unique.
+    """
+    n = len(seq)
+    if n == 0:
+        return []
+    sa = sorted(range(n), key=seq.__getitem__)
+    rank = [0] * n
+    for r in range(1, n):
+        rank[sa[r]] = rank[sa[r - 1]] + (seq[sa[r]] != seq[sa[r - 1]])
+
+    k = 1
+    while rank[sa[-1]] < n - 1:
+        keys = [rank[i] * (n + 1) + (rank[i + k] + 1 if i + k < n else 0) for i in range(n)]
+        sa.sort(key=keys.__getitem__)
+        new_rank = [0] * n
+        for r in range(1, n):
+            new_rank[sa[r]] = new_rank[sa[r - 1]] + (keys[sa[r]] != keys[sa[r - 1]])
+        rank = new_rank
+        k *= 2
+    return sa
+
+
+def lcp_array(seq, sa):
+    """Kasai's algorithm: lcp[r] = common prefix length of suffixes sa[r-1] and sa[r]."""
+    n = len(seq)
+    rank = [0] * n
+    for r, i in enumerate(sa):
+        rank[i] = r
+    lcp = [0] * n
+    h = 0
+    for i in range(n):
+        if rank[i] > 0:
+            j = sa[rank[i] - 1]
+            while i + h < n and j + h < n and seq[i + h] == seq[j + h]:
+                h += 1
+            lcp[rank[i]] = h
+            if h:
+                h -= 1
+        else:
+            h = 0
+    return lcp
+
+
+# --- Passage search ---
+def _best_partners(sa, lcp, n1):
+    """For every suffix, its longest match among suffixes of the other document.
+
+    Two linear sweeps over the suffix array (top-down and bottom-up), carrying
+    the last suffix seen from each document and the minimum LCP since then.
+    Returns {position: (partner position, match length)}.
+    """
+    best = {}
+    for order in (range(len(sa)), range(len(sa) - 1, -1, -1)):
+        last = [None, None]     # last suffix seen from doc1 / doc2
+        run = [0, 0]            # min LCP between that suffix and the current one
+        prev = None
+        for r in order:
+            if prev is not None:
+                step = lcp[max(prev, r)]
+                run = [min(run[0], step), min(run[1], step)]
+            prev = r
+            i = sa[r]
+            doc = 0 if i < n1 else 1
+            other = 1 - doc
+            if last[other] is not None and run[other] > best.get(i, (None, 0))[1]:
+                best[i] = (last[other], run[other])
+            last[doc] = i
+            run[doc] = len(sa)  # nothing between a suffix and itself
+    return best
+
+
+def common_passages(text1, text2, min_words=MIN_WORDS):
+    """All passages of >= min_words words found in both texts.
+
+    Returns a list of Passage tuples sorted by position in text2. Runs in
+    O(n log n) sorting rounds plus linear scans, n = total number of words.
+    """
+    words1, spans1 = tokenize(text1)
+    words2, spans2 = tokenize(text2)
+    if len(words1) < min_words or len(words2) < min_words:
+        return []
+
+    # Map words to ints; 0 and 1 are the end-of-document sentinels
+    ids = {}
+    seq = [ids.setdefault(w, len(ids) + 2) for w in words1] + [0]
+    seq += [ids.setdefault(w, len(ids) + 2) for w in words2] + [1]
+    n1 = len(words1) + 1
+
+    sa = suffix_array(seq)
+    lcp = lcp_array(seq, sa)
+
+    found = set()
+    for i, (j, length) in _best_partners(sa, lcp, n1).items():
+        if length < min_words:
+            continue
+        p1, p2 = (i, j - n1) if i < n1 else (j, i - n1)
+        # Keep only left-maximal matches; the longer one starting a word
+        # earlier already covers this one.
+        if p1 > 0 and p2 > 0 and words1[p1 - 1] == words2[p2 - 1]:
+            continue
+        found.add((p1, p2, length))
+
+    passages = [Passage(spans1[p1][0], spans1[p1 + length - 1][1],
+                        spans2[p2][0], spans2[p2 + length - 1][1], length)
+                for p1, p2, length in found]
+    passages.sort(key=lambda p: (p.start2, p.start1))
+    return passages
+
+
+def merge_spans(spans):
+    """Merge overlapping (start, end) spans, e.g. before highlighting."""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def highlight_spans(passages):
+    """Merged character spans to highlight in text1 and in text2."""
+    return (merge_spans((p.start1, p.end1) for p in passages),
+            merge_spans((p.start2, p.end2) for p in passages))
@@ -0,0 +1,259 @@
+"""
+Local plagiarism service: one long-running process with everything kept warm.
+
+Every check used to start a fresh Python process, import nltk again,
+re-open the fingerprint store and page cache and rebuild the corpus index.
+This service does all of that once and then answers checks over HTTP on
+localhost, so a repeated check costs milliseconds:
+
+    GET  /status                 -> what is loaded
+    POST /compare  {text1, text2}-> winnowing scores + matching passages
+    POST /corpus   {text}        -> most similar corpus documents (needs --corpus)
+    POST /online   {text}        -> {"job": id}; the online check runs in the
+                                    background (it takes seconds to minutes)
+    GET  /jobs/<id>              -> progress, partial matches, final result
+    POST /jobs/<id>/cancel
+
+The Tkinter frontends talk to it through service_client.py and fall back to
+checking locally when it isn't running. The other scripts may keep using the
+same fingerprint_db folder while the service is up: FingerprintStore locks
+the folder between processes and picks up what other handles wrote.
+
+Usage:
+    python plagiarism_service.py [--port 8765] [--corpus FOLDER]
+        [--store fingerprint_db] [--page-cache page_cache]
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fingerprint_store import FingerprintStore
+from minhash_lsh import build_corpus_index, find_similar
+from normalization import Normalizer
+from page_cache import PageCache
+from passages import common_passages
+from winnowing import score_fingerprints
+
+# The online check needs googlesearch and nltk; the rest of the service
+# works without them
+try:
+    import online_check
+except ImportError as error:
+    online_check = None
+    _ONLINE_MISSING = str(error)
+
+# --- Settings ---
+HOST = "127.0.0.1"      # local machine only
+PORT = 8765
+STORE_FOLDER = "fingerprint_db"
+PAGE_CACHE_FOLDER = "page_cache"
+JOB_TTL = 15 * 60       # seconds a finished online job is kept for its client
+MAX_BODY = 50 * 1024 * 1024
+
+
+class _Job:
+    """State of one online check, read by GET /jobs/<id>."""
+
+    def __init__(self):
+        self.cancel_event = threading.Event()
+        self.done = 0
+        self.total = 0
+        self.text = "Queued"
+        self.sentences = []
+        self.matches = []
+        self.stats = None
+        self.state = "running"      # running / done / cancelled / error
+        self.error = None
+        self.finished_at = None
+
+    def as_dict(self):
+        return {
+            "state": self.state, "error": self.error,
+            "done": self.done, "total": self.total, "text": self.text,
+            "sentences": self.sentences,
+            "matches": [list(m) for m in self.matches],
+            "stats": self.stats._asdict() if self.stats else None,
+        }
+
+
+class PlagiarismService:
+    """Warm state shared by all requests.
+
+    The fingerprint store and page cache are not thread-safe, so each has a
+    lock; online checks run one at a time anyway since searches are rate
+    limited.
+    """
+
+    def __init__(self, store_folder=STORE_FOLDER, page_cache_folder=PAGE_CACHE_FOLDER,
+                 corpus=None):
+        self.started = time.time()
+        self.normalizer = Normalizer()
+        # Held open for the service's lifetime; safe alongside other handles
+        # on the folder (the store locks it across processes)
+        self.store = FingerprintStore(store_folder)
+        self.page_cache = PageCache(page_cache_folder)
+        self.corpus = corpus
+        self.index = build_corpus_index(corpus, self.store) if corpus else None
+        if online_check is not None:
+            online_check.split_sentences("Warm up the tokenizer. It loads lazily.")
+        self._store_lock = threading.Lock()
+        self._online_lock = threading.Lock()
+        self._jobs = {}
+        self._job_ids = itertools.count(1)
+
+    def close(self):
+        self.store.close()
+        self.page_cache.close()
+
+    def status(self):
+        return {
+            "uptime": time.time() - self.started,
+            "stored_documents": len(self.store),
+            "corpus": self.corpus,
+            "corpus_documents": len(self.index) if self.index else 0,
+            "online": online_check is not None,
+        }
+
+    # --- Document checks ---
+    def compare(self, text1, text2):
+        normalized1 = self.normalizer.normalize(text1)
+        normalized2 = self.normalizer.normalize(text2)
+        with self._store_lock:
+            similarity = score_fingerprints(self.store.fingerprint_set(normalized1),
+                                            self.store.fingerprint_set(normalized2))
+        passages = common_passages(text1, text2)
+        return {"similarity": similarity._asdict(),
+                "passages": [list(p) for p in passages]}
+
+    def corpus_matches(self, text, min_score=0.1):
+        if self.index is None:
+            raise ValueError("service was started without --corpus")
+        with self._store_lock:
+            # Raw text, like the corpus documents the index was built from
+            found = find_similar(self.index, text, min_score, store=self.store)
+        return {"matches": [[path, similarity._asdict()] for path, similarity in found]}
+
+    # --- Online checks ---
+    def start_online(self, text):
+        if online_check is None:
+            raise ValueError(f"online check unavailable: {_ONLINE_MISSING}")
+        self._forget_old_jobs()
+        job_id = str(next(self._job_ids))
+        job = self._jobs[job_id] = _Job()
+        threading.Thread(target=self._run_online, args=(job, text), daemon=True).start()
+        return {"job": job_id}
+
+    def _run_online(self, job, text):
+        def progress(done, total, sentences, matches):
+            job.done, job.total = done, total
+            job.text = f"{done}/{total} searches and pages"
+            job.sentences, job.matches = sentences, matches
+
+        try:
+            with self._online_lock:
+                if not job.cancel_event.is_set():
+                    job.text = "Searching..."
+                    job.sentences, job.matches, job.stats = online_check.check_text_online(
+                        text, self.page_cache, progress, job.cancel_event.is_set)
+            job.state = "cancelled" if job.cancel_event.is_set() else "done"
+        except Exception as error:
+            job.state, job.error = "error", str(error)
+        job.finished_at = time.time()
+
+    def job(self, job_id):
+        return self._jobs[job_id].as_dict()
+
+    def cancel(self, job_id):
+        self._jobs[job_id].cancel_event.set()
+        return {"state": self._jobs[job_id].state}
+
+    def _forget_old_jobs(self):
+        cutoff = time.time() - JOB_TTL
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+
+# --- HTTP ---
+class _Handler(BaseHTTPRequestHandler):
+    service = None      # set by serve()
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY:
+            raise ValueError("request too large")
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _route(self, routes):
+        parts = self.path.strip("/").split("/")
+        try:
+            if parts[0] == "jobs" and len(parts) >= 2:
+                action = parts[2] if len(parts) > 2 else ""
+                handler = routes.get(("jobs", action))
+                result = handler(parts[1]) if handler else None
+            else:
+                handler = routes.get(parts[0])
+                result = handler() if handler else None
+            if handler is None:
+                self._reply(404, {"error": f"no such endpoint: {self.path}"})
+            else:
+                self._reply(200, result)
+        except KeyError:
+            self._reply(404, {"error": "no such job"})
+        except (ValueError, TypeError) as error:
+            self._reply(400, {"error": str(error)})
+
+    def do_GET(self):
+        self._route({
+            "status": self.service.status,
+            ("jobs", ""): self.service.job,
+        })
+
+    def do_POST(self):
+        self._route({
+            "compare": lambda: self.service.compare(**self._body()),
+            "corpus": lambda: self.service.corpus_matches(**self._body()),
+            "online": lambda: self.service.start_online(**self._body()),
+            ("jobs", "cancel"): self.service.cancel,
+        })
+
+    def log_message(self, format, *args):
+        pass    # keep the console quiet; every GUI poll would be logged
+
+
+def serve(service, host=HOST, port=PORT):
+    """Answer requests until interrupted (Ctrl+C)."""
+    _Handler.service = service
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    print(f"Plagiarism service on http://{host}:{port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local plagiarism service")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--corpus", help="folder of documents to index for /corpus")
+    parser.add_argument("--store", default=STORE_FOLDER)
+    parser.add_argument("--page-cache", default=PAGE_CACHE_FOLDER)
+    args = parser.parse_args()
+
+    serve(PlagiarismService(args.store, args.page_cache, args.corpus), port=args.port)
@@ -0,0 +1,239 @@
+"""
+Query planner for the online plagiarism checker.
+
+The checker used to send one search(sentence, pause=2) per sentence, so a
+200-sentence essay spent over six minutes just sleeping between queries. The
+planner cuts the number of queries and keeps the waiting off the critical path:
+
+ - adjacent sentences are merged into groups, and each group is searched with
+   one quoted phrase: its most distinctive run of QUERY_WORDS words (rare,
+   long words rather than "the", "and", ...)
+ - before a group is searched, the pages fetched so far are checked; if they
+   already cover the group's sentences, the query is skipped
+ - the phrase comes from one sentence of the group, so once the group's pages
+   are scanned, every sentence they didn't cover gets a query of its own
+   (a sentence copied from another source than its neighbours isn't missed)
+ - searches are paced by a token bucket that awaits (asyncio.sleep) instead of
+   sleeping inline, so page downloads keep running while the next query waits
+ - mirrors and scraped copies of a page already scanned are recognised by
+   their SimHash and not scored again
+"""
+
+import asyncio
+import re
+import time
+from collections import Counter, deque, namedtuple
+
+from async_fetch import AsyncFetcher
+from page_cache import fetch_text
+from page_index import ShingleMatcher, words
+from simhash import SimHashIndex, simhash_words
+
+# --- Settings ---
+GROUP_SIZE = 3          # adjacent sentences covered by one query
+QUERY_WORDS = 8         # words in each quoted query phrase
+SKIP_SCORE = 0.8        # sentence counts as found once a page matches this well
+QUERY_RATE = 0.5        # searches per second (the old code used pause=2)
+QUERY_BURST = 3         # searches allowed back to back before pacing starts
+
+_WORD = re.compile(r"\w+")
+
+Query = namedtuple("Query", ["text", "sentences"])
+Query.__doc__ = """A planned search: the phrase to send and the sentence numbers it covers."""
+
+PlanStats = namedtuple("PlanStats", ["sentences", "planned", "sent", "skipped",
+                                     "duplicate_pages", "follow_ups"])
+
+
+# --- Rate limiting ---
+class TokenBucket:
+    """Token-bucket rate limiter whose waits never block the event loop."""
+
+    def __init__(self, rate=QUERY_RATE, capacity=QUERY_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """Take a token if one is available right now; never waits."""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        """Wait (asynchronously) until a token is available, then take it."""
+        while not self.try_acquire():
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# --- Planning ---
+def _distinctive_phrase(words, frequency, size=QUERY_WORDS):
+    """The run of size words with the rarest, longest words in it."""
+    if len(words) <= size:
+        return words
+
+    def weight(word):
+        return len(word) / frequency[word.lower()]
+
+    weights = [weight(w) for w in words]
+    best_start = 0
+    best = total = sum(weights[:size])
+    for start in range(1, len(words) - size + 1):
+        total += weights[start + size - 1] - weights[start - 1]
+        if total > best:
+            best_start, best = start, total
+    return words[best_start:best_start + size]
+
+
+def plan_queries(sentences, group_size=GROUP_SIZE, size=QUERY_WORDS):
+    """Merge adjacent sentences into groups -> [Query] with one phrase each.
+
+    Word rarity is measured within the document itself, so words repeated
+    all over the essay are avoided in favour of ones that pin down a passage.
+    """
+    frequency = Counter(w.lower() for sentence in sentences for w in _WORD.findall(sentence))
+    queries = []
+    for start in range(0, len(sentences), group_size):
+        numbers = list(range(start, min(start + group_size, len(sentences))))
+        # Pick the phrase from a single sentence so it is contiguous on the page
+        candidates = [_distinctive_phrase(_WORD.findall(sentences[n]), frequency, size)
+                      for n in numbers]
+        phrase = max(candidates, key=lambda words: sum(len(w) / frequency[w.lower()]
+                                                        for w in words))
+        if phrase:
+            queries.append(Query('"' + " ".join(phrase) + '"', numbers))
+    return queries
+
+
+# --- Running a check ---
+async def check_sentences(sentences, search_fn, extract, cache=None, bucket=None,
+                          progress=None, should_stop=None, **fetcher_options):
+    """Search, fetch and score all sentences -> ([Match] per sentence, PlanStats).
+
+    search_fn(query) is the blocking search call returning result URLs; it runs
+    in a worker thread. Result pages are fetched concurrently (through the page
+    cache when given) while the next search waits for its token.
+
+    progress(done, total, matches) is called after every query and page with
+    the results so far; once should_stop() returns True, pending downloads are
+    abandoned and the partial results are returned.
+    """
+    matcher = ShingleMatcher(sentences)
+    queries = plan_queries(sentences)
+    # One-sentence queries, for sentences their group's pages didn't cover
+    single = {q.sentences[0]: q for q in plan_queries(sentences, group_size=1)}
+    pending = deque(queries)
+    queued_texts = {q.text for q in queries}    # never search the same phrase twice
+    searched = []           # (group query, its page downloads) not yet followed up
+    bucket = bucket or TokenBucket()
+    seen_urls = {}          # url -> download task
+    downloads = []
+    sent = skipped = duplicates = follow_ups = 0
+    scanned_pages = SimHashIndex()
+
+    def covered(query):
+        results = matcher.results()
+        return all(results[n].score >= SKIP_SCORE for n in query.sentences)
+
+    def report():
+        if progress:
+            # Each query counts as one step, each page download as one more
+            done = sent + skipped + sum(1 for d in downloads if d.done())
+            progress(done, len(queries) + follow_ups + len(downloads), matcher.results())
+
+    def queue_follow_ups():
+        """Queue single-sentence queries for groups whose pages are all scanned."""
+        nonlocal follow_ups
+        results = matcher.results()
+        for entry in list(searched):
+            query, tasks = entry
+            if all(t.done() for t in tasks):
+                searched.remove(entry)
+                for n in query.sentences:
+                    if results[n].score < SKIP_SCORE and n in single:
+                        # The group's phrase may have come from this very
+                        # sentence; searching it again finds the same pages
+                        if single[n].text in queued_texts:
+                            continue
+                        queued_texts.add(single[n].text)
+                        pending.append(single[n])
+                        follow_ups += 1
+
+    async def download(url):
+        nonlocal duplicates
+        text = await fetch_text(fetcher, cache, url, extract)
+        if not text:
+            return
+        page_words = words(text)
+        fingerprint = simhash_words(page_words)
+        # An empty fingerprint (no words) would match every other empty one
+        if fingerprint:
+            if scanned_pages.near_duplicate(fingerprint) is not None:
+                duplicates += 1     # a mirror of a page already scored
+                return
+            scanned_pages.add(fingerprint, url)
+        matcher.scan_page(url, text, page_words)
+
+    async with AsyncFetcher(**fetcher_options) as fetcher:
+        while pending or searched:
+            if should_stop and should_stop():
+                break
+            queue_follow_ups()
+            if not pending:
+                # Only follow-ups can come now: wait for more pages to arrive
+                if searched:
+                    await asyncio.wait([t for _, tasks in searched for t in tasks],
+                                       timeout=0.2, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            query = pending.popleft()
+            report()
+            if covered(query):
+                skipped += 1
+                continue
+            await bucket.acquire()
+            # Check again: pages that arrived while we waited for the token
+            # may cover this group now
+            if covered(query):
+                skipped += 1
+                continue
+
+            sent += 1
+            try:
+                urls = await asyncio.to_thread(search_fn, query.text)
+            except Exception:
+                urls = []
+            tasks = []
+            for url in urls:
+                if url not in seen_urls:
+                    task = asyncio.create_task(download(url))
+                    task.add_done_callback(lambda _: report())
+                    seen_urls[url] = task
+                    downloads.append(task)
+                tasks.append(seen_urls[url])
+            if len(query.sentences) > 1:
+                searched.append((query, tasks))
+
+        while any(not d.done() for d in downloads):
+            if should_stop and should_stop():
+                for d in downloads:
+                    d.cancel()
+                break
+            await asyncio.wait(downloads, timeout=0.2)
+        await asyncio.gather(*downloads, return_exceptions=True)
+        report()
+
+    return matcher.results(), PlanStats(len(sentences), len(queries) + follow_ups, sent,
+                                        skipped, duplicates, follow_ups)
+
+
+def check_sentences_online(sentences, search_fn, extract, cache=None, **fetcher_options):
+    """Blocking wrapper around check_sentences()."""
+    return asyncio.run(check_sentences(sentences, search_fn, extract, cache, **fetcher_options))
@@ -0,0 +1,95 @@
+"""
+Client for the local plagiarism service (plagiarism_service.py).
+
+Every call raises ServiceUnavailable when the service isn't running, so
+callers can fall back to checking locally:
+
+    try:
+        similarity, passages = service_client.compare(text1, text2)
+    except service_client.ServiceUnavailable:
+        ...     # do it in-process
+"""
+
+import json
+import time
+import urllib.error
+import urllib.request
+
+from page_index import Match
+from passages import Passage
+from query_planner import PlanStats
+from winnowing import Similarity
+
+# --- Settings ---
+SERVICE_URL = "http://127.0.0.1:8765"
+TIMEOUT = 60        # seconds for one request (document comparisons can be slow)
+POLL_SECONDS = 0.25
+
+# Never send localhost requests through a proxy from the environment
+_opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+class ServiceUnavailable(Exception):
+    """The service isn't running (or didn't answer)."""
+
+
+class ServiceError(Exception):
+    """The service answered with an error."""
+
+
+def _request(path, payload=None, timeout=TIMEOUT):
+    data = None if payload is None else json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(SERVICE_URL + path, data=data,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with _opener.open(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        raise ServiceError(json.loads(error.read() or b"{}").get("error", error.reason))
+    except (urllib.error.URLError, ConnectionError, TimeoutError) as error:
+        raise ServiceUnavailable(str(error))
+
+
+def status(timeout=1.0):
+    """What the service has loaded; quick way to see if it is running."""
+    return _request("/status", timeout=timeout)
+
+
+def compare(text1, text2):
+    """(Similarity, [Passage]) for two documents."""
+    reply = _request("/compare", {"text1": text1, "text2": text2})
+    return (Similarity(**reply["similarity"]),
+            [Passage(*p) for p in reply["passages"]])
+
+
+def corpus_matches(text, min_score=0.1):
+    """[(path, Similarity)] of the service's corpus, best first."""
+    reply = _request("/corpus", {"text": text, "min_score": min_score})
+    return [(path, Similarity(**similarity)) for path, similarity in reply["matches"]]
+
+
+def check_online(text, progress=None, should_stop=None, poll=POLL_SECONDS):
+    """(sentences, [Match] per sentence, PlanStats) from an online check.
+
+    The check runs inside the service; this polls it, calling
+    progress(done, total, text, sentences, matches) on the way. Once
+    should_stop() returns True the job is cancelled and the partial results
+    are returned.
+    """
+    job_id = _request("/online", {"text": text})["job"]
+    cancelled = False
+    while True:
+        job = _request(f"/jobs/{job_id}")
+        sentences = job["sentences"]
+        matches = [Match(*m) for m in job["matches"]]
+        if progress:
+            progress(job["done"], job["total"], job["text"], sentences, matches)
+        if job["state"] == "error":
+            raise ServiceError(job["error"])
+        if job["state"] != "running":
+            stats = PlanStats(**job["stats"]) if job["stats"] else None
+            return sentences, matches, stats
+        if not cancelled and should_stop and should_stop():
+            _request(f"/jobs/{job_id}/cancel", {})
+            cancelled = True
+        time.sleep(poll)
@@ -0,0 +1,127 @@
+"""
+SimHash fingerprints and a Hamming-distance index for near-duplicate pages.
+
+Searching for a copied sentence often returns mirrors and scraped copies of
+the same page. A SimHash is a 64-bit fingerprint of a page's word shingles
+where similar pages get fingerprints that differ in only a few bits, so near
+duplicates can be spotted without comparing the pages themselves.
+
+SimHashIndex finds fingerprints within MAX_DISTANCE bits with the
+multi-index trick: the 64 bits are cut into MAX_DISTANCE + 1 blocks, and two
+fingerprints that differ in at most MAX_DISTANCE bits must agree exactly on
+at least one block (pigeonhole). Each block gets a dict, so a lookup only
+compares against fingerprints sharing a block instead of all of them.
+
+Fingerprints use Python's hash(), which is randomized per process: compare
+them within one run (one check), don't store them.
+"""
+
+from collections import defaultdict
+
+from page_index import words
+
+# --- Settings ---
+BITS = 64
+SHINGLE = 3             # words per feature
+SAMPLE = 8              # one in SAMPLE shingles is used as a feature
+MAX_DISTANCE = 4        # pages whose fingerprints differ in <= this many bits are duplicates
+
+_MASK = (1 << BITS) - 1
+
+
+# Bit counting: every byte value maps to an int with one LANE-bit counter per
+# bit of the byte, shifted to that byte's lanes. Adding up 8 table entries per
+# feature counts all 64 bit positions at once.
+_LANE = 32
+_SPREAD = [sum(1 << (bit * _LANE) for bit in range(8) if value >> bit & 1)
+           for value in range(256)]
+_TABLES = [[spread << (byte * 8 * _LANE) for spread in _SPREAD] for byte in range(BITS // 8)]
+_LANE_MASK = (1 << _LANE) - 1
+
+
+def simhash(text, size=SHINGLE, sample=SAMPLE):
+    """64-bit SimHash of text's word shingles."""
+    return simhash_words(words(text), size, sample)
+
+
+def simhash_words(word_list, size=SHINGLE, sample=SAMPLE):
+    """64-bit SimHash of a word list's shingles (each shingle counted once).
+
+    Only shingles starting at one in `sample` words (picked by the word's
+    hash, so mirrors pick the same ones) are used: near duplicates still get
+    close fingerprints, at a fraction of the cost of scoring the page.
+
+    A text without words gets 0, which says nothing about the page: don't
+    use it to spot duplicates.
+    """
+    hashes = list(map(hash, word_list))
+    if len(hashes) < size:
+        features = {hash(tuple(hashes)) & _MASK} if hashes else set()
+    else:
+        starts = range(len(hashes) - size + 1)
+        features = {hash(tuple(hashes[i:i + size])) & _MASK
+                    for i in starts if hashes[i] % sample == 0}
+        if not features:
+            # Short page where no word got sampled: use every shingle
+            features = {hash(tuple(hashes[i:i + size])) & _MASK for i in starts}
+
+    # A bit is set when more than half of the features have it set
+    t0, t1, t2, t3, t4, t5, t6, t7 = _TABLES
+    counts = sum(t0[h & 255] + t1[h >> 8 & 255] + t2[h >> 16 & 255] + t3[h >> 24 & 255]
+                 + t4[h >> 32 & 255] + t5[h >> 40 & 255] + t6[h >> 48 & 255] + t7[h >> 56]
+                 for h in features)
+    half = len(features) / 2
+    fingerprint = 0
+    for bit in range(BITS):
+        if (counts >> (bit * _LANE)) & _LANE_MASK > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class SimHashIndex:
+    """Fingerprints -> items, searchable by Hamming distance.
+
+        index = SimHashIndex()
+        if index.near_duplicate(fp) is None:
+            index.add(fp, url)
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE, bits=BITS):
+        self.max_distance = max_distance
+        blocks = max_distance + 1
+        # (shift, mask) of each block; sizes differ by at most one bit
+        self._blocks = []
+        start = 0
+        for number in range(blocks):
+            width = bits // blocks + (1 if number < bits % blocks else 0)
+            self._blocks.append((start, (1 << width) - 1))
+            start += width
+        self._tables = [defaultdict(list) for _ in self._blocks]
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, fingerprint, item):
+        for (shift, mask), table in zip(self._blocks, self._tables):
+            table[fingerprint >> shift & mask].append((fingerprint, item))
+        self._size += 1
+
+    def query(self, fingerprint):
+        """[(item, distance)] of every fingerprint within max_distance, closest first."""
+        found = {}
+        for (shift, mask), table in zip(self._blocks, self._tables):
+            for other, item in table.get(fingerprint >> shift & mask, ()):
+                distance = hamming(fingerprint, other)
+                if distance <= self.max_distance:
+                    found[id(item), other] = (item, distance)
+        return sorted(found.values(), key=lambda pair: pair[1])
+
+    def near_duplicate(self, fingerprint):
+        """Closest item within max_distance, or None."""
+        matches = self.query(fingerprint)
+        return matches[0][0] if matches else None
@@ -0,0 +1,162 @@
+"""
+Coarse "which submissions look alike" screening with TF-IDF cosine similarity.
+
+Every document in a folder becomes a sparse TF-IDF vector; the top-k most
+similar neighbours of each document are then found with blocked sparse matrix
+products instead of scoring pairs one at a time.
+
+Memory stays bounded for ~100k documents:
+ - words are hashed into a fixed number of columns (N_FEATURES), so there is
+   no vocabulary dictionary growing with the corpus
+ - the matrix is built from compact arrays, one document at a time
+ - similarities are computed ROW_BLOCK x COL_BLOCK at a time; only the running
+   top-k per row is kept, never the full N x N matrix
+
+Needs numpy and scipy:
+    pip install numpy scipy
+
+Usage:
+    python tfidf_neighbors.py <folder> [--top-k 5] [--output neighbours.csv]
+"""
+
+import argparse
+import csv
+import math
+import os
+import zlib
+from array import array
+
+import numpy as np
+from scipy import sparse
+
+from documents import iter_documents
+from normalization import Normalizer
+
+# --- Settings ---
+N_FEATURES = 1 << 20    # hashed vocabulary size
+ROW_BLOCK = 1000        # documents per row block
+COL_BLOCK = 10000       # documents per column block (dense block = ROW x COL floats)
+TOP_K = 5
+
+
+# --- Building the matrix ---
+def _hashed_counts(words, n_features=N_FEATURES):
+    """{column: count} for a list of words, using a stable hash (crc32)."""
+    counts = {}
+    for word in words:
+        column = zlib.crc32(word.encode("utf-8")) % n_features
+        counts[column] = counts.get(column, 0) + 1
+    return counts
+
+
+def tfidf_matrix(texts, n_features=N_FEATURES, normalizer=None):
+    """L2-normalized TF-IDF CSR matrix (one row per text).
+
+    tf is sublinear (1 + log count) and idf is smoothed:
+    log((1 + N) / (1 + df)) + 1, like scikit-learn's defaults.
+    """
+    normalizer = normalizer or Normalizer(stopwords=True)
+    indptr = array("q", [0])
+    indices = array("i")
+    data = array("f")
+    for text in texts:
+        counts = _hashed_counts(normalizer.normalize(text).split(), n_features)
+        columns = sorted(counts)
+        indices.extend(columns)
+        data.extend(1.0 + math.log(counts[c]) for c in columns)
+        indptr.append(len(indices))
+
+    n_docs = len(indptr) - 1
+    matrix = sparse.csr_matrix((np.frombuffer(data, dtype=np.float32),
+                                np.frombuffer(indices, dtype=np.int32),
+                                np.frombuffer(indptr, dtype=np.int64)),
+                               shape=(n_docs, n_features))
+    df = np.bincount(matrix.indices, minlength=n_features)
+    idf = (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+    matrix = matrix.multiply(idf).tocsr()
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags((1.0 / norms).astype(np.float32)) @ matrix
+
+
+# --- Nearest neighbours ---
+def top_k_neighbours(matrix, k=TOP_K, row_block=ROW_BLOCK, col_block=COL_BLOCK):
+    """(indices, scores): the k most similar other rows for every row.
+
+    Both arrays are n_docs x k, best first; missing neighbours are -1 / 0.0.
+    """
+    n = matrix.shape[0]
+    k = min(k, max(n - 1, 0))
+    best_idx = np.full((n, k), -1, dtype=np.int64)
+    best_sim = np.zeros((n, k), dtype=np.float32)
+    if k == 0:
+        return best_idx, best_sim
+
+    columns = matrix.T.tocsc()      # column slices of X.T are cheap in CSC
+    for r0 in range(0, n, row_block):
+        r1 = min(r0 + row_block, n)
+        rows = matrix[r0:r1]
+        cand_idx = best_idx[r0:r1]
+        cand_sim = best_sim[r0:r1]
+        for c0 in range(0, n, col_block):
+            c1 = min(c0 + col_block, n)
+            block = (rows @ columns[:, c0:c1]).toarray()
+            # A document is not its own neighbour
+            overlap = np.arange(max(r0, c0), min(r1, c1))
+            block[overlap - r0, overlap - c0] = -1.0
+
+            # Merge this block's best k into the running top-k of each row
+            kk = min(k, c1 - c0)
+            part = np.argpartition(-block, kk - 1, axis=1)[:, :kk]
+            merged_sim = np.hstack([cand_sim, np.take_along_axis(block, part, axis=1)])
+            merged_idx = np.hstack([cand_idx, part + c0])
+            keep = np.argpartition(-merged_sim, k - 1, axis=1)[:, :k]
+            cand_sim = np.take_along_axis(merged_sim, keep, axis=1)
+            cand_idx = np.take_along_axis(merged_idx, keep, axis=1)
+
+        order = np.argsort(-cand_sim, axis=1)
+        best_sim[r0:r1] = np.take_along_axis(cand_sim, order, axis=1)
+        best_idx[r0:r1] = np.take_along_axis(cand_idx, order, axis=1)
+
+    best_idx[best_sim <= 0] = -1
+    best_sim[best_sim < 0] = 0.0
+    return best_idx, best_sim
+
+
+def folder_neighbours(folder, k=TOP_K):
+    """(paths, indices, scores) for every document in folder."""
+    paths = []
+
+    def texts():
+        for path, text in iter_documents(folder):
+            paths.append(path)
+            yield text
+
+    matrix = tfidf_matrix(texts())
+    indices, scores = top_k_neighbours(matrix, k)
+    return paths, indices, scores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Top-k TF-IDF neighbours for a folder")
+    parser.add_argument("folder")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--output", help="write neighbours to this CSV file")
+    args = parser.parse_args()
+
+    doc_paths, neighbour_idx, neighbour_sim = folder_neighbours(args.folder, args.top_k)
+    names = [os.path.basename(p) for p in doc_paths]
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["document", "rank", "neighbour", "cosine"])
+            for name, idx_row, sim_row in zip(names, neighbour_idx, neighbour_sim):
+                for rank, (j, sim) in enumerate(zip(idx_row, sim_row), 1):
+                    if j >= 0:
+                        writer.writerow([name, rank, names[j], f"{sim:.4f}"])
+        print(f"Saved neighbours of {len(names)} documents to {args.output}")
+    else:
+        for name, idx_row, sim_row in zip(names, neighbour_idx, neighbour_sim):
+            listed = ", ".join(f"{names[j]} ({sim:.2f})" for j, sim in zip(idx_row, sim_row) if j >= 0)
+            print(f"{name}: {listed}")
@@ -0,0 +1,122 @@
+"""
+Winnowing fingerprint engine (Schleimer, Wilkerson & Aiken, "Winnowing: Local
+Algorithms for Document Fingerprinting").
+
+How it works:
+ - normalize the text (lowercase, letters/digits only)
+ - hash every k-character substring (k-gram) with a rolling hash
+ - slide a window of `window` hashes over that list and keep the smallest one
+   from each window -> these are the document's fingerprints
+
+Any copied passage at least (k + window - 1) characters long is guaranteed to
+share a fingerprint with its source. Everything runs in linear time, unlike
+SequenceMatcher which slows down badly on long essays.
+"""
+
+from collections import deque, namedtuple
+
+# --- Settings ---
+K = 13          # k-gram length in normalized characters
+WINDOW = 8      # winnowing window; copies of >= K + WINDOW - 1 chars always match
+
+# Rolling hash parameters (Karp-Rabin over a Mersenne prime modulus)
+_BASE = 257
+_MOD = (1 << 61) - 1
+
+Similarity = namedtuple("Similarity", ["jaccard", "containment", "shared"])
+Similarity.__doc__ = """Result of compare_documents().
+jaccard     - |A & B| / |A | B| over the two fingerprint sets (0.0 - 1.0)
+containment - |A & B| / |A|, how much of the first document is in the second
+shared      - number of fingerprints the documents have in common
+"""
+
+
+# --- Normalization ---
+def normalize(text):
+    """Lowercase letters/digits only; also return each char's offset in text."""
+    chars = []
+    positions = []
+    for i, ch in enumerate(text):
+        if ch.isalnum():
+            chars.append(ch.lower())
+            positions.append(i)
+    return "".join(chars), positions
+
+
+# --- Hashing ---
+def kgram_hashes(normalized, k=K):
+    """Rolling hash of every k-gram in the normalized text."""
+    n = len(normalized)
+    if n == 0:
+        return []
+    if n < k:
+        k = n  # short text: the whole thing is one k-gram
+
+    high = pow(_BASE, k - 1, _MOD)
+    h = 0
+    for ch in normalized[:k]:
+        h = (h * _BASE + ord(ch)) % _MOD
+    hashes = [h]
+    for i in range(k, n):
+        h = ((h - ord(normalized[i - k]) * high) * _BASE + ord(normalized[i])) % _MOD
+        hashes.append(h)
+    return hashes
+
+
+def winnow(hashes, window=WINDOW):
+    """Pick the minimum hash of every window -> list of (hash, position)."""
+    if not hashes:
+        return []
+    if len(hashes) <= window:
+        # Fewer hashes than one window: keep the (rightmost) minimum
+        pos = min(range(len(hashes)), key=lambda i: (hashes[i], -i))
+        return [(hashes[pos], pos)]
+
+    # Monotonic deque of candidate positions, hashes increasing front -> back.
+    # Popping on ">=" keeps the rightmost minimum, as the paper recommends.
+    candidates = deque()
+    fingerprints = []
+    last = -1
+    for i, h in enumerate(hashes):
+        while candidates and hashes[candidates[-1]] >= h:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1 and candidates[0] != last:
+            last = candidates[0]
+            fingerprints.append((hashes[last], last))
+    return fingerprints
+
+
+def fingerprints(text, k=K, window=WINDOW):
+    """Winnowed (hash, position) fingerprints of raw text.
+
+    Positions index into the normalized text; use normalize() to map them
+    back to the original characters.
+    """
+    normalized, _ = normalize(text)
+    return winnow(kgram_hashes(normalized, k), window)
+
+
+def fingerprint_set(text, k=K, window=WINDOW):
+    """Set of fingerprint hashes (positions dropped) used for scoring."""
+    return {h for h, _ in fingerprints(text, k, window)}
+
+
+# --- Scoring ---
+def score_fingerprints(fp1, fp2):
+    """Compare two fingerprint hash sets -> Similarity."""
+    if not fp1 and not fp2:
+        return Similarity(0.0, 0.0, 0)
+    shared = len(fp1 & fp2)
+    union = len(fp1) + len(fp2) - shared
+    jaccard = shared / union if union else 0.0
+    containment = shared / len(fp1) if fp1 else 0.0
+    return Similarity(jaccard, containment, shared)
+
+
+def compare_documents(text1, text2, k=K, window=WINDOW):
+    """Score two documents in linear time -> Similarity(jaccard, containment, shared)."""
+    return score_fingerprints(fingerprint_set(text1, k, window),
+                              fingerprint_set(text2, k, window))